@@ -0,0 +1,66 @@
+"""
+Offline ingestion benchmark: serial fetch-then-upload loop vs the
+pipelined engine (per-day and range-batched requests), using the local
+Copernicus stand-in and a simulated upload (sleep + local storage backend).
+
+    python benchmarks/ingest_benchmark.py [days] [fetch_latency] [upload_latency]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data.fetch_copernicus import fetch_daily_data
+from data.ingest_pipeline import archive_key, run_ingestion
+from data.local_copernicus import LocalCopernicusClient
+from data.storage import LocalStorage
+
+BBOX = (-45, -10, 110, 155)
+
+
+def make_upload(root, latency):
+    storage = LocalStorage(root)
+
+    def upload(local_path, key):
+        time.sleep(latency)
+        storage.upload(local_path, key)
+    return upload
+
+
+def serial(days, client, upload):
+    for day in days:
+        files = fetch_daily_data(str(day), *BBOX, client=client)
+        for name, path in files.items():
+            upload(path, archive_key(day, name))
+
+
+def pipelined(days, client, upload):
+    failures = run_ingestion(days, BBOX, client=client, upload=upload)
+    assert not failures, failures
+
+
+def batched(days, client, upload):
+    failures = run_ingestion(days, BBOX, client=client, upload=upload, batch=True)
+    assert not failures, failures
+
+
+if __name__ == "__main__":
+    n_days = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    fetch_latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    upload_latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+
+    start = datetime.date(2026, 1, 1)
+    days = [start + datetime.timedelta(days=i) for i in range(n_days)]
+    client = LocalCopernicusClient(latency=fetch_latency)
+
+    for label, run in [("serial", serial), ("pipelined", pipelined), ("batched", batched)]:
+        root = tempfile.mkdtemp(prefix=f"hab_bench_{label}_")
+        t0 = time.perf_counter()
+        run(days, client, make_upload(root, upload_latency))
+        elapsed = time.perf_counter() - t0
+        shutil.rmtree(root)
+        print(f"{label:>10}: {elapsed:6.2f} s  ({n_days} days × 5 datasets)")
@@ -0,0 +1,71 @@
+"""
+Offline loader benchmark on the in-memory storage backend: the archive is
+ingested with the local Copernicus stand-in, then load_from_s3 is timed on
+raw files vs merged objects, cold vs warm cache and in-memory decoding.
+
+    python benchmarks/loader_benchmark.py [days]
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data.storage import MemoryStorage, set_storage
+
+storage = MemoryStorage()
+set_storage(storage)
+
+from data.compact_zarr import merged_day
+from data.ingest_pipeline import publish_merged_day, run_ingestion
+from data.local_copernicus import LocalCopernicusClient
+from data.manifest import empty_manifest, save_manifest
+from data import s3_loader
+from data.s3_cache import S3ObjectCache, set_cache
+
+INGEST_BBOX = (-45, -10, 110, 155)
+QUERY_BBOX = (-35, -20, 120, 140)
+
+
+def ingest(days, merged):
+    manifest = empty_manifest()
+
+    def on_day(day, files):
+        if merged:
+            publish_merged_day(day, merged_day(day, files), manifest=manifest)
+
+    failures = run_ingestion(
+        days, INGEST_BBOX, manifest=manifest, client=LocalCopernicusClient(), on_day=on_day
+    )
+    assert not failures, failures
+    save_manifest(manifest)
+
+
+def timed(label, days, **kwargs):
+    t0 = time.perf_counter()
+    ds = s3_loader.load_from_s3(days[0], days[-1], *QUERY_BBOX, **kwargs)
+    elapsed = time.perf_counter() - t0
+    print(f"{label:>22}: {elapsed:6.2f} s  ({ds.time.size} days, {ds.nbytes / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    n_days = int(sys.argv[1]) if len(sys.argv) > 1 else 14
+
+    start = datetime.date(2026, 1, 1)
+    days = [start + datetime.timedelta(days=i) for i in range(n_days)]
+
+    for merged in (False, True):
+        storage.objects.clear()
+        ingest(days, merged)
+
+        cache_dir = tempfile.mkdtemp(prefix="hab_bench_cache_")
+        set_cache(S3ObjectCache(cache_dir=cache_dir))
+
+        layout = "merged" if merged else "raw"
+        timed(f"{layout} cold cache", days)
+        timed(f"{layout} warm cache", days)
+        timed(f"{layout} in-memory", days, in_memory=True)
+        shutil.rmtree(cache_dir)
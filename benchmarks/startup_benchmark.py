@@ -0,0 +1,55 @@
+"""
+Dashboard cold-start benchmark: time to first paint of streamlit_app.py,
+i.e. a full first script run with no dataset loaded, in a fresh
+interpreter each time so every import is paid for. Also reports which
+heavy modules that first run pulled in.
+
+    python benchmarks/startup_benchmark.py [runs]
+"""
+import os
+import sys
+import json
+import subprocess
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+HEAVY_MODULES = ["tensorflow", "cartopy", "seaborn", "boto3", "dask", "matplotlib.pyplot"]
+
+# Runs in the child interpreter
+CHILD = """
+import sys, time, json
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({app!r}, default_timeout=300)
+app.run()
+elapsed = time.perf_counter() - t0
+print(json.dumps({{
+    "seconds": elapsed,
+    "exception": [str(e.value) for e in app.exception],
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def first_paint():
+    code = CHILD.format(app=os.path.join(SRC, "streamlit_app.py"), heavy=HEAVY_MODULES)
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SRC, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    times = []
+    for i in range(runs):
+        result = first_paint()
+        if result["exception"]:
+            raise SystemExit(f"❌ App raised: {result['exception']}")
+        times.append(result["seconds"])
+        print(f"run {i + 1}: {result['seconds']:6.2f} s  heavy modules loaded: {result['loaded'] or 'none'}")
+
+    times.sort()
+    print(f"time to first paint: median {times[len(times) // 2]:.2f} s, best {times[0]:.2f} s")
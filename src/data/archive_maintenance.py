@@ -0,0 +1,196 @@
+import sys
+import argparse
+import datetime
+from data.manifest import (
+    DAILY_FILES,
+    PREFIX,
+    empty_manifest,
+    load_manifest,
+    parse_key,
+    rebuild_manifest,
+    rolled_up,
+    save_manifest,
+)
+from data.ingest_journal import empty_journal, load_journal, save_journal
+from data.storage import get_storage
+
+
+# =========================================================
+# BATCHED DELETE
+# =========================================================
+def list_keys(prefix):
+    """[(key, size)] under `prefix` from a paginated listing."""
+    return [(obj["key"], obj["size"]) for obj in get_storage().list(prefix)]
+
+
+def delete_keys(keys):
+    """
+    Delete `keys`; on S3 with delete_objects, DELETE_BATCH keys per call
+    and DELETE_WORKERS calls in flight (see data.storage).
+    Returns the keys that could not be deleted.
+    """
+    return get_storage().delete(keys)
+
+
+def _forget(keys, manifest, journal):
+    """Drop deleted daily objects from the manifest and the journal."""
+    for key in keys:
+        parsed = parse_key(key)
+        if parsed is None:
+            continue
+        day, fname = parsed
+        files = manifest["days"].get(day.isoformat(), {})
+        files.pop(fname, None)
+        if not files:
+            manifest["days"].pop(day.isoformat(), None)
+        journal["units"].pop(f"{day.isoformat()}/{fname.removesuffix('.nc')}", None)
+
+
+def _report(label, keys, sizes):
+    total = sum(sizes.get(key, 0) for key in keys)
+    days = sorted({key.split("/", 1)[1].rsplit("/", 1)[0] for key in keys if key.startswith(PREFIX)})
+    span = f", days {days[0]} → {days[-1]}" if days else ""
+    print(f"🧹 {label}: {len(keys)} objects, {total / 1e6:.1f} MB{span}")
+
+
+# =========================================================
+# POLICIES
+# =========================================================
+def compacted_days(store=None):
+    """Set of days present in the Zarr cube (empty when there is no cube)."""
+    from data.compact_zarr import open_cube
+
+    cube = open_cube(store)
+    if cube is None:
+        return set()
+    return {datetime.date.fromisoformat(str(t)[:10]) for t in cube.time.values}
+
+
+def raw_retention_keys(manifest, keep_days, require_zarr=False, today=None):
+    """
+    Raw daily files older than `keep_days` whose day is rolled up into a
+    merged object (and, with `require_zarr`, compacted into the cube).
+    Days without a merged object are never touched.
+    """
+    today = today or datetime.date.today()
+    cutoff = today - datetime.timedelta(days=keep_days)
+    cube_days = compacted_days() if require_zarr else None
+
+    keys = []
+    for day_str, files in sorted(manifest["days"].items()):
+        day = datetime.date.fromisoformat(day_str)
+        if day >= cutoff or not rolled_up(files):
+            continue
+        if require_zarr and day not in cube_days:
+            continue
+        keys += [
+            f"{PREFIX}{day.strftime('%Y/%m/%d')}/{fname}"
+            for fname in DAILY_FILES if fname in files
+        ]
+    return keys
+
+
+def rollup_days(manifest, start_date, end_date):
+    """Build and publish the merged object for complete days that lack one."""
+    from data.compact_zarr import merged_day
+    from data.ingest_pipeline import publish_merged_day
+
+    done = 0
+    for day_str, files in sorted(manifest["days"].items()):
+        day = datetime.date.fromisoformat(day_str)
+        if not start_date <= day <= end_date or rolled_up(files):
+            continue
+        if any(f not in files for f in DAILY_FILES):
+            print(f"⚠️ {day}: incomplete, not rolled up")
+            continue
+        try:
+            publish_merged_day(day, merged_day(day), manifest=manifest)
+            done += 1
+        except Exception as e:
+            print(f"⚠️ Could not roll up {day}: {e}")
+    return done
+
+
+# =========================================================
+# COMMANDS
+# =========================================================
+def _apply(keys, sizes, manifest, journal, dry_run, label):
+    _report(label + (" (dry run)" if dry_run else ""), keys, sizes)
+    if dry_run or not keys:
+        return
+
+    failed = set(delete_keys(keys))
+    _forget([key for key in keys if key not in failed], manifest, journal)
+    save_manifest(manifest)
+    save_journal(journal)
+    print(f"✅ Deleted {len(keys) - len(failed)} objects, {len(failed)} failed")
+
+
+def retain(keep_days, require_zarr=False, dry_run=False):
+    manifest = load_manifest() or rebuild_manifest()
+    keys = raw_retention_keys(manifest, keep_days, require_zarr)
+    sizes = {
+        f"{PREFIX}{day.replace('-', '/')}/{fname}": entry["size"]
+        for day, files in manifest["days"].items()
+        for fname, entry in files.items()
+    }
+    _apply(keys, sizes, manifest, load_journal(), dry_run, f"Raw files older than {keep_days} days")
+
+
+def purge(prefix=PREFIX, dry_run=False):
+    """Delete everything under `prefix`; the manifest and journal follow."""
+    listing = list_keys(prefix)
+    keys = [key for key, _ in listing]
+    sizes = dict(listing)
+
+    if prefix == PREFIX:
+        # Whole archive: start the bookkeeping from scratch
+        _report("Purge" + (" (dry run)" if dry_run else ""), keys, sizes)
+        if dry_run:
+            return
+        failed = delete_keys(keys)
+        save_manifest(empty_manifest())
+        save_journal(empty_journal())
+        print(f"✅ Deleted {len(keys) - len(failed)} objects, {len(failed)} failed")
+        return
+
+    manifest = load_manifest() or rebuild_manifest()
+    _apply(keys, sizes, manifest, load_journal(), dry_run, f"Purge {prefix}")
+
+
+# =========================================================
+# CLI
+#   python -m data.archive_maintenance retain 30 [--require-zarr] [--dry-run]
+#   python -m data.archive_maintenance rollup 2026-01-01 2026-02-01
+#   python -m data.archive_maintenance purge [prefix] [--dry-run]
+# =========================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m data.archive_maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("retain", help="drop rolled-up raw files older than N days")
+    p.add_argument("keep_days", type=int)
+    p.add_argument("--require-zarr", action="store_true", help="only days already in the Zarr cube")
+    p.add_argument("--dry-run", action="store_true")
+
+    p = commands.add_parser("rollup", help="publish merged objects for complete days")
+    p.add_argument("start", type=datetime.date.fromisoformat)
+    p.add_argument("end", type=datetime.date.fromisoformat)
+
+    p = commands.add_parser("purge", help="delete everything under a prefix")
+    p.add_argument("prefix", nargs="?", default=PREFIX)
+    p.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args(sys.argv[1:])
+
+    if args.command == "retain":
+        retain(args.keep_days, args.require_zarr, args.dry_run)
+
+    elif args.command == "rollup":
+        m = load_manifest() or rebuild_manifest()
+        n = rollup_days(m, args.start, args.end)
+        save_manifest(m)
+        print(f"✅ Rolled up {n} days")
+
+    elif args.command == "purge":
+        purge(args.prefix, args.dry_run)
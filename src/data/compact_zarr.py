@@ -0,0 +1,147 @@
+import sys
+import datetime
+import numpy as np
+import xarray as xr
+import zarr
+from data.s3_loader import (
+    FILES,
+    build_day,
+    load_from_s3,
+    open_daily_file,
+    zarr_store,
+)
+
+# =========================================================
+# CONFIG
+# =========================================================
+FEATURES = [var for variables in FILES.values() for var in variables]
+
+# ~1 MB float32 chunks: a month of days on a 5°×7.5° patch of the 0.25° grid
+CHUNKS = {"time": 30, "latitude": 20, "longitude": 30}
+
+TIME_EPOCH = "2000-01-01"
+TIME_UNITS = f"days since {TIME_EPOCH}"
+
+
+# =========================================================
+# STORE HELPERS
+# =========================================================
+def open_cube(store=None):
+    store = store or zarr_store()
+    try:
+        return xr.open_zarr(store, consolidated=True)
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+
+
+def _prepare(ds_day):
+    """Keep the FEATURES as float32 on the chl grid, NaN-filling missing vars."""
+    template = ds_day[next(iter(ds_day.data_vars))]
+    for var in FEATURES:
+        if var not in ds_day:
+            ds_day[var] = xr.full_like(template, np.nan)
+    return ds_day[FEATURES].astype("float32")
+
+
+def _write(ds_day, store, cube):
+    if cube is None:
+        encoding = {
+            var: {"chunks": tuple(CHUNKS[d] for d in ds_day[var].dims)}
+            for var in FEATURES
+        }
+        encoding["time"] = {"units": TIME_UNITS, "dtype": "int32"}
+        ds_day.to_zarr(store, mode="w", encoding=encoding, consolidated=True)
+    else:
+        ds_day.to_zarr(store, append_dim="time", consolidated=True)
+
+
+def _insert(ds_day, store, cube):
+    """
+    Ordered insert of a day older than the cube's end (a gap filled late).
+    Only the days after it are rewritten: the cube grows by one step and
+    the tail from the insertion point is written back shifted by one.
+    """
+    index = int(np.searchsorted(cube.time.values, ds_day.time.values[0]))
+    tail = cube.isel(time=slice(index, None)).load()
+    for var in tail.variables.values():
+        var.encoding = {}
+
+    shifted = xr.concat([ds_day, tail], dim="time")
+
+    region = slice(index, index + shifted.time.size)
+    shifted.isel(time=[-1]).to_zarr(store, append_dim="time", consolidated=True)
+    shifted.drop_vars(["latitude", "longitude"]).to_zarr(
+        store, region={"time": region}, consolidated=True
+    )
+
+    # Region writes never touch index coordinates: shift the time axis too
+    days = (shifted.time.values - np.datetime64(TIME_EPOCH)) // np.timedelta64(1, "D")
+    zarr.open_group(store, mode="r+")["time"][region] = days.astype("int32")
+
+
+# =========================================================
+# COMPACTION
+# =========================================================
+def merged_day(day, files=None):
+    """
+    One day with every FEATURE as float32 on the chl grid.
+
+    `files` maps name ("pft", "nut", ...) -> local NetCDF path, as returned
+    by fetch_daily_data. Without it the day is read back from the S3 archive.
+    """
+    if files is None:
+        ds_day = load_from_s3(day, day, -90, 90, -180, 360, source="netcdf")
+    else:
+        datasets = {f"{name}.nc": open_daily_file(path) for name, path in files.items()}
+        ds_day = build_day(day, datasets)
+        if ds_day is None:
+            raise RuntimeError(f"❌ No data for {day}")
+
+    return _prepare(ds_day)
+
+
+def append_day(day, files=None, store=None, ds_day=None):
+    """
+    Append one day to the Zarr cube, from `files` (see merged_day) or an
+    already merged `ds_day`.
+    Days already in the cube are skipped; a day older than the cube's end
+    (a gap filled by a later run) is inserted in date order.
+    `store` defaults to zarr_store().
+    """
+    store = store or zarr_store()
+    cube = open_cube(store)
+    stamp = np.datetime64(day, "ns")
+
+    if cube is not None and stamp in cube.time.values:
+        print(f"⏭️ {day} already compacted")
+        return False
+
+    if ds_day is None:
+        ds_day = merged_day(day, files)
+
+    if cube is not None and cube.time.size and stamp < cube.time.values[-1]:
+        _insert(ds_day, store, cube)
+    else:
+        _write(ds_day, store, cube)
+    print(f"🧊 Compacted {day} into {store}")
+    return True
+
+
+def compact_range(start_date, end_date, store=None):
+    """Backfill the cube from the daily archive, one day at a time."""
+    current = start_date
+    while current <= end_date:
+        try:
+            append_day(current, store=store)
+        except RuntimeError as e:
+            print(f"⚠️ Skipping {current}: {e}")
+        current += datetime.timedelta(days=1)
+
+
+# =========================================================
+# CLI:  python -m data.compact_zarr 2026-01-01 2026-02-01 [store]
+# =========================================================
+if __name__ == "__main__":
+    start = datetime.date.fromisoformat(sys.argv[1])
+    end = datetime.date.fromisoformat(sys.argv[2])
+    compact_range(start, end, *sys.argv[3:4])
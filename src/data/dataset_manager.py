@@ -0,0 +1,105 @@
+import datetime
+import numpy as np
+import xarray as xr
+from data.s3_loader import load_from_s3
+
+
+def _to_date(t):
+    return np.datetime64(t, "D").astype(datetime.date)
+
+
+def _runs(days):
+    """Sorted dates grouped into contiguous (first, last) runs."""
+    runs = []
+    for day in days:
+        if runs and day - runs[-1][1] == datetime.timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+
+def _bbox_contains(outer, inner):
+    lat_min, lat_max, lon_min, lon_max = outer
+    i_lat_min, i_lat_max, i_lon_min, i_lon_max = inner
+    return (
+        lat_min <= i_lat_min and i_lat_max <= lat_max
+        and lon_min <= i_lon_min and i_lon_max <= lon_max
+    )
+
+
+# =========================================================
+# SESSION DATASET MANAGER
+# =========================================================
+class SessionDataset:
+    """
+    Keeps the cube a dashboard session is working on and extends it
+    incrementally when the analysis window moves.
+
+    - days already held are reused; only the days of the new window not
+      held yet are loaded (at either end, or inside it when they had no
+      data at an earlier call), days outside it are dropped
+    - a bbox inside the held one is served by slicing in memory
+    - anything else (wider bbox, disjoint window, lazy toggle) reloads
+    """
+
+    def __init__(self, loader=load_from_s3):
+        self.loader = loader
+        self.ds = None
+        self.bbox = None
+        self.lazy = None
+
+    def _held_range(self):
+        times = self.ds.time.values
+        return _to_date(times[0]), _to_date(times[-1])
+
+    def _load(self, start_date, end_date, bbox, lazy):
+        return self.loader(start_date, end_date, *bbox, lazy=lazy)
+
+    def _try_load(self, start_date, end_date):
+        try:
+            return self._load(start_date, end_date, self.bbox, self.lazy)
+        except RuntimeError:
+            # Nothing archived for these days (yet)
+            return None
+
+    def get(self, start_date, end_date, lat_min, lat_max, lon_min, lon_max, lazy=False):
+        bbox = (lat_min, lat_max, lon_min, lon_max)
+
+        reusable = (
+            self.ds is not None
+            and lazy == self.lazy
+            and _bbox_contains(self.bbox, bbox)
+        )
+        if reusable:
+            held_start, held_end = self._held_range()
+            reusable = start_date <= held_end and end_date >= held_start
+
+        if not reusable:
+            self.ds = self._load(start_date, end_date, bbox, lazy)
+            self.bbox = bbox
+            self.lazy = lazy
+        else:
+            held = {_to_date(t) for t in self.ds.time.values}
+            window = [
+                start_date + datetime.timedelta(days=i)
+                for i in range((end_date - start_date).days + 1)
+            ]
+
+            pieces = [self.ds.sel(
+                time=slice(np.datetime64(start_date), np.datetime64(end_date))
+            )]
+            # Days never loaded, or without data so far, one request per run
+            for first, last in _runs([day for day in window if day not in held]):
+                pieces.append(self._try_load(first, last))
+
+            pieces = [p for p in pieces if p is not None and p.time.size]
+            if len(pieces) == 1:
+                self.ds = pieces[0]
+            else:
+                self.ds = xr.concat(pieces, dim="time").sortby("time")
+
+        return self.ds.sel(
+            latitude=slice(lat_min, lat_max),
+            longitude=slice(lon_min, lon_max)
+        )
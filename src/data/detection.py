@@ -1,10 +1,13 @@
 import numpy as np
+import xarray as xr
 
 def detect_bloom(chl, threshold):
+    # Elementwise, so dask-backed input stays lazy
     return chl > threshold
 
 def classify_intensity(chl):
-    return np.where(
+    where = xr.where if isinstance(chl, xr.DataArray) else np.where
+    return where(
         chl < 1, 0,
-        np.where(chl < 5, 1, 2)
+        where(chl < 5, 1, 2)
     )
@@ -1,111 +1,147 @@
-import copernicusmarine
+import datetime
 import tempfile
 import os
+import xarray as xr
 
-def fetch_daily_data(date, lat_min, lat_max, lon_min, lon_max):
-    """
-    Download Copernicus data for ONE day into a date-isolated temp folder.
-    This avoids Copernicus caching / overwrite issues.
-    """
+# =========================================================
+# DATASETS (one subset request each per day)
+# =========================================================
+DATASETS = {
+    # 1. Phytoplankton (chl, phyc)
+    "pft": {
+        "dataset_id": "cmems_mod_glo_bgc-pft_anfc_0.25deg_P1D-m",
+        "variables": ["chl", "phyc"],
+        "depth": True,
+    },
+    # 2. Net Primary Production
+    "bio": {
+        "dataset_id": "cmems_mod_glo_bgc-bio_anfc_0.25deg_P1D-m",
+        "variables": ["nppv"],
+        "depth": True,
+    },
+    # 3. Nutrients
+    "nut": {
+        "dataset_id": "cmems_mod_glo_bgc-nut_anfc_0.25deg_P1D-m",
+        "variables": ["no3", "po4"],
+        "depth": True,
+    },
+    # 4. Currents
+    "cur": {
+        "dataset_id": "cmems_mod_glo_phy-cur_anfc_0.083deg_P1D-m",
+        "variables": ["uo", "vo"],
+        "depth": True,
+    },
+    # 5. SST anomaly (surface product, no depth axis)
+    "sst": {
+        "dataset_id": "cmems_mod_glo_phy_anfc_0.083deg-sst-anomaly_P1D-m",
+        "variables": ["sea_surface_temperature_anomaly"],
+        "depth": False,
+    },
+}
 
-    # Create unique folder per day
+
+def day_dir_for(date):
+    """Date-isolated temp folder (avoids Copernicus caching / overwrite issues)."""
     day_dir = os.path.join(tempfile.gettempdir(), f"cmems_{date}")
     os.makedirs(day_dir, exist_ok=True)
+    return day_dir
 
-    files = {
-        "pft": os.path.join(day_dir, f"pft_{date}.nc"),
-        "bio": os.path.join(day_dir, f"bio_{date}.nc"),
-        "nut": os.path.join(day_dir, f"nut_{date}.nc"),
-        "cur": os.path.join(day_dir, f"cur_{date}.nc"),
-        "sst": os.path.join(day_dir, f"sst_{date}.nc"),
-    }
 
-    # -------------------------------------------------
-    # 1. Phytoplankton (chl, phyc)
-    # -------------------------------------------------
-    copernicusmarine.subset(
-        dataset_id="cmems_mod_glo_bgc-pft_anfc_0.25deg_P1D-m",
-        variables=["chl", "phyc"],
-        minimum_latitude=lat_min,
-        maximum_latitude=lat_max,
-        minimum_longitude=lon_min,
-        maximum_longitude=lon_max,
-        start_datetime=date,
-        end_datetime=date,
-        minimum_depth=0,
-        maximum_depth=1,
-        output_directory=day_dir,
-        output_filename=f"pft_{date}.nc"
-    )
+def fetch_dataset(name, date, lat_min, lat_max, lon_min, lon_max, client=None):
+    """
+    Download ONE dataset for ONE day and return the local path.
+    `client` is anything with copernicusmarine's `subset` signature
+    (defaults to copernicusmarine itself).
+    """
+    if client is None:
+        import copernicusmarine
+        client = copernicusmarine
+    spec = DATASETS[name]
+    day_dir = day_dir_for(date)
 
-    # -------------------------------------------------
-    # 2. Net Primary Production
-    # -------------------------------------------------
-    copernicusmarine.subset(
-        dataset_id="cmems_mod_glo_bgc-bio_anfc_0.25deg_P1D-m",
-        variables=["nppv"],
+    kwargs = dict(
+        dataset_id=spec["dataset_id"],
+        variables=spec["variables"],
         minimum_latitude=lat_min,
         maximum_latitude=lat_max,
         minimum_longitude=lon_min,
         maximum_longitude=lon_max,
         start_datetime=date,
         end_datetime=date,
-        minimum_depth=0,
-        maximum_depth=1,
         output_directory=day_dir,
-        output_filename=f"bio_{date}.nc"
+        output_filename=f"{name}_{date}.nc"
     )
+    if spec["depth"]:
+        kwargs.update(minimum_depth=0, maximum_depth=1)
 
-    # -------------------------------------------------
-    # 3. Nutrients
-    # -------------------------------------------------
-    copernicusmarine.subset(
-        dataset_id="cmems_mod_glo_bgc-nut_anfc_0.25deg_P1D-m",
-        variables=["no3", "po4"],
-        minimum_latitude=lat_min,
-        maximum_latitude=lat_max,
-        minimum_longitude=lon_min,
-        maximum_longitude=lon_max,
-        start_datetime=date,
-        end_datetime=date,
-        minimum_depth=0,
-        maximum_depth=1,
-        output_directory=day_dir,
-        output_filename=f"nut_{date}.nc"
-    )
+    client.subset(**kwargs)
 
-    # -------------------------------------------------
-    # 4. Currents
-    # -------------------------------------------------
-    copernicusmarine.subset(
-        dataset_id="cmems_mod_glo_phy-cur_anfc_0.083deg_P1D-m",
-        variables=["uo", "vo"],
-        minimum_latitude=lat_min,
-        maximum_latitude=lat_max,
-        minimum_longitude=lon_min,
-        maximum_longitude=lon_max,
-        start_datetime=date,
-        end_datetime=date,
-        minimum_depth=0,
-        maximum_depth=1,
-        output_directory=day_dir,
-        output_filename=f"cur_{date}.nc"
-    )
+    return os.path.join(day_dir, f"{name}_{date}.nc")
 
-    # -------------------------------------------------
-    # 5. SST anomaly
-    # -------------------------------------------------
-    copernicusmarine.subset(
-        dataset_id="cmems_mod_glo_phy_anfc_0.083deg-sst-anomaly_P1D-m",
-        variables=["sea_surface_temperature_anomaly"],
+
+def fetch_dataset_range(name, start_date, end_date, lat_min, lat_max, lon_min, lon_max, client=None):
+    """
+    Download ONE dataset for a whole date range with a single subset
+    request, then split it into the usual per-day files.
+    Returns {date: local_path} for every day the server returned.
+    """
+    if client is None:
+        import copernicusmarine
+        client = copernicusmarine
+    spec = DATASETS[name]
+    range_dir = os.path.join(tempfile.gettempdir(), f"cmems_{start_date}_{end_date}")
+    os.makedirs(range_dir, exist_ok=True)
+    range_file = f"{name}_{start_date}_{end_date}.nc"
+
+    kwargs = dict(
+        dataset_id=spec["dataset_id"],
+        variables=spec["variables"],
         minimum_latitude=lat_min,
         maximum_latitude=lat_max,
         minimum_longitude=lon_min,
         maximum_longitude=lon_max,
-        start_datetime=date,
-        end_datetime=date,
-        output_directory=day_dir,
-        output_filename=f"sst_{date}.nc"
+        start_datetime=str(start_date),
+        end_datetime=str(end_date),
+        output_directory=range_dir,
+        output_filename=range_file
     )
+    if spec["depth"]:
+        kwargs.update(minimum_depth=0, maximum_depth=1)
+
+    client.subset(**kwargs)
+
+    range_path = os.path.join(range_dir, range_file)
+    try:
+        return split_daily(range_path, name)
+    finally:
+        os.remove(range_path)
+
+
+def split_daily(path, name):
+    """Split a multi-day NetCDF into day_dir_for(date)/{name}_{date}.nc files."""
+    paths = {}
+    with xr.open_dataset(path) as ds:
+        for i, t in enumerate(ds.time.values):
+            date = str(t)[:10]
+            day = ds.isel(time=[i])
+
+            # Chunk layout of the range file does not fit a single day
+            for var in day.variables.values():
+                var.encoding.pop("chunksizes", None)
+                var.encoding.pop("original_shape", None)
 
-    return files
+            out = os.path.join(day_dir_for(date), f"{name}_{date}.nc")
+            day.to_netcdf(out)
+            paths[datetime.date.fromisoformat(date)] = out
+    return paths
+
+
+def fetch_daily_data(date, lat_min, lat_max, lon_min, lon_max, client=None):
+    """
+    Download Copernicus data for ONE day into a date-isolated temp folder.
+    This avoids Copernicus caching / overwrite issues.
+    """
+    return {
+        name: fetch_dataset(name, date, lat_min, lat_max, lon_min, lon_max, client)
+        for name in DATASETS
+    }
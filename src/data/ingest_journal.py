@@ -0,0 +1,162 @@
+import sys
+import json
+import datetime
+from data.storage import NotFound, get_storage
+
+# =========================================================
+# CONFIG
+# =========================================================
+JOURNAL_KEY = "ingest_journal.json"
+
+# Each (day, dataset) unit moves forward through these states
+FETCHED, UPLOADED, VERIFIED = "fetched", "uploaded", "verified"
+
+# =========================================================
+# INGESTION JOURNAL
+# =========================================================
+# {
+#   "version": 1,
+#   "updated": "2026-02-03T06:00:00",
+#   "units": {
+#     "2026-02-01/pft": {
+#       "state": "verified",
+#       "path": "/tmp/cmems_2026-02-01/pft_2026-02-01.nc",
+#       "size": 123, "sha256": "…", "etag": "\"…\"",
+#       "error": null, "attempts": 1
+#     },
+#     ...
+#   }
+# }
+
+
+def empty_journal():
+    return {"version": 1, "updated": None, "units": {}}
+
+
+def load_journal():
+    """Fetch the journal with a single GET. Returns an empty one if it does not exist."""
+    try:
+        body = get_storage().get(JOURNAL_KEY)
+    except NotFound:
+        return empty_journal()
+    return json.loads(body)
+
+
+def save_journal(journal):
+    journal["updated"] = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    get_storage().put(
+        JOURNAL_KEY,
+        json.dumps(journal, sort_keys=True).encode(),
+        content_type="application/json",
+    )
+
+
+def _unit_key(day, name):
+    return f"{day.isoformat()}/{name}"
+
+
+def unit(journal, day, name):
+    """Journal entry for one (day, dataset) unit, or None."""
+    return journal["units"].get(_unit_key(day, name))
+
+
+def state(journal, day, name):
+    entry = unit(journal, day, name)
+    return entry["state"] if entry else None
+
+
+# =========================================================
+# TRANSITIONS
+# =========================================================
+def mark_fetched(journal, day, name, path, size, sha256):
+    """
+    Record a fetched file. Returns False when it is byte-identical to what
+    was already uploaded for this unit (the upload can then be skipped).
+    """
+    entry = journal["units"].setdefault(_unit_key(day, name), {"attempts": 0})
+    entry["attempts"] += 1
+    entry["error"] = None
+    unchanged = entry.get("state") in (UPLOADED, VERIFIED) and entry.get("sha256") == sha256
+
+    entry.update(path=path, size=size, sha256=sha256)
+    if not unchanged:
+        entry.update(state=FETCHED, etag=None)
+    return not unchanged
+
+
+def mark_uploaded(journal, day, name):
+    journal["units"][_unit_key(day, name)]["state"] = UPLOADED
+
+
+def mark_verified(journal, day, name, etag):
+    entry = journal["units"][_unit_key(day, name)]
+    entry.update(state=VERIFIED, etag=etag, error=None)
+
+
+def mark_failed(journal, day, name, error):
+    """Keep the last state reached and note the error; the unit stays incomplete."""
+    entry = journal["units"].setdefault(_unit_key(day, name), {"state": None, "attempts": 0})
+    entry["error"] = str(error)
+
+
+# =========================================================
+# RECONCILIATION
+# =========================================================
+def reconcile(journal, manifest):
+    """
+    Bring the journal and the manifest into agreement before a run.
+
+    - A unit in the manifest but not verified in the journal (e.g. uploaded
+      before the journal existed) is marked verified.
+    - A verified unit missing from the manifest (e.g. the manifest save was
+      lost) is restored to the manifest from the journal.
+    """
+    for day, files in manifest["days"].items():
+        for fname, obj in files.items():
+            name = fname.removesuffix(".nc")
+            entry = journal["units"].setdefault(f"{day}/{name}", {"attempts": 0})
+            if entry.get("state") != VERIFIED:
+                entry.update(
+                    state=VERIFIED,
+                    size=obj["size"],
+                    etag=obj["etag"],
+                    sha256=obj.get("sha256") or entry.get("sha256"),
+                    error=None,
+                )
+
+    for key, entry in journal["units"].items():
+        if entry.get("state") != VERIFIED:
+            continue
+        day, name = key.split("/")
+        manifest["days"].setdefault(day, {}).setdefault(f"{name}.nc", {
+            "size": entry["size"],
+            "etag": entry["etag"],
+            "sha256": entry.get("sha256"),
+        })
+
+
+def incomplete_units(journal):
+    """[(date, name, entry)] for every journaled unit that is not verified."""
+    return [
+        (datetime.date.fromisoformat(key.split("/")[0]), key.split("/")[1], entry)
+        for key, entry in sorted(journal["units"].items())
+        if entry.get("state") != VERIFIED
+    ]
+
+
+# =========================================================
+# CLI:  python -m data.ingest_journal status
+# =========================================================
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+
+    if command == "status":
+        j = load_journal()
+        pending = incomplete_units(j)
+        print(f"📒 {len(j['units'])} units journaled, {len(pending)} incomplete")
+        for day, name, entry in pending:
+            print(f"⚠️ {day} {name}: {entry.get('state') or 'not fetched'}"
+                  + (f" ({entry['error']})" if entry.get("error") else ""))
+
+    else:
+        raise SystemExit(f"Unknown command: {command}")
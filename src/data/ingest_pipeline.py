@@ -0,0 +1,336 @@
+import os
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from data.fetch_copernicus import DATASETS, day_dir_for, fetch_dataset, fetch_dataset_range
+from data.upload_s3 import head_s3, upload_to_s3
+from data.manifest import file_sha256, record_upload
+from data.repack import PACK_MODE, repack_netcdf, size_report
+from data.tiles import ARCHIVE_LAYOUT, split_tiles
+from data.ingest_journal import (
+    FETCHED,
+    UPLOADED,
+    VERIFIED,
+    mark_failed,
+    mark_fetched,
+    mark_uploaded,
+    mark_verified,
+    state,
+    unit,
+)
+
+# =========================================================
+# CONFIG
+# =========================================================
+# Fetches run in processes: copernicusmarine writes NetCDF through HDF5,
+# which is not thread-safe. Uploads are I/O only and use threads.
+FETCH_WORKERS = 5
+UPLOAD_WORKERS = 8
+
+# netCDF-C/HDF5 are not thread-safe: merged objects are encoded one at a
+# time and only their uploads run in parallel
+_encode_lock = threading.Lock()
+
+# Range-batched backfill: longest date range requested in one subset call
+MAX_BATCH_DAYS = 31
+
+
+# Name of the pre-merged daily object (see publish_merged_day); tiles
+# are named merged_<lat0>_<lon0>
+MERGED_NAME = "merged"
+
+
+def archive_key(day, name):
+    return f"daily/{day.strftime('%Y/%m/%d')}/{name}.nc"
+
+
+# =========================================================
+# STAGES
+# =========================================================
+def _fetched(day, name, path, pack_mode):
+    """Re-encode a fetched file (see data.repack) and checksum the result."""
+    raw_size, size = repack_netcdf(path, pack_mode)
+    return (day, name, path, size, file_sha256(path), raw_size)
+
+
+def _fetch_unit(name, day, bbox, client, pack_mode):
+    """Fetch stage: returns [(day, name, local_path, size, sha256, raw_size), ...]."""
+    path = fetch_dataset(name, str(day), *bbox, client=client)
+    return [_fetched(day, name, path, pack_mode)]
+
+
+def _fetch_range_unit(name, days, bbox, client, pack_mode):
+    """
+    Fetch stage for a contiguous run of days in one subset request.
+    When the request fails (e.g. one day is not published yet) or leaves
+    days out, those days are fetched one by one, so an unavailable day
+    only costs itself.
+    """
+    try:
+        paths = fetch_dataset_range(name, days[0], days[-1], *bbox, client=client)
+    except Exception as e:
+        print(f"⚠️ {name} {days[0]}…{days[-1]} range request failed ({e}), fetching day by day")
+        paths = {}
+
+    results = [_fetched(day, name, paths[day], pack_mode) for day in days if day in paths]
+    for day in days:
+        if day in paths:
+            continue
+        try:
+            results += _fetch_unit(name, day, bbox, client, pack_mode)
+        except Exception as e:
+            print(f"❌ fetch failed for {name} {day}: {e}")
+    return results
+
+
+def _batches(days):
+    """Split sorted days into contiguous runs of at most MAX_BATCH_DAYS."""
+    runs = []
+    for day in days:
+        if runs and len(runs[-1]) < MAX_BATCH_DAYS and (day - runs[-1][-1]).days == 1:
+            runs[-1].append(day)
+        else:
+            runs.append([day])
+    return runs
+
+
+def _resumable(entry):
+    """True when a journaled fetch is still on local disk, byte-identical."""
+    return (
+        entry is not None
+        and entry.get("state") in (FETCHED, UPLOADED)
+        and entry.get("path")
+        and os.path.exists(entry["path"])
+        and file_sha256(entry["path"]) == entry.get("sha256")
+    )
+
+
+def _upload_unit(day, name, path, sha256, skip_upload, upload, verify, manifest, journal, state_lock):
+    """
+    Upload stage: push one file (unless an identical copy is already up),
+    verify it with a head() and record it in the manifest and journal.
+    """
+    key = archive_key(day, name)
+
+    if not skip_upload:
+        upload(path, key)
+        if journal is not None:
+            with state_lock:
+                mark_uploaded(journal, day, name)
+
+    head = None
+    if manifest is not None or journal is not None:
+        head = verify(key)
+        if head["size"] != os.path.getsize(path):
+            raise RuntimeError(
+                f"{key}: uploaded size {head['size']} != local {os.path.getsize(path)}"
+            )
+
+    with state_lock:
+        if manifest is not None:
+            record_upload(manifest, key, path, head=head, sha256=sha256)
+        if journal is not None:
+            mark_verified(journal, day, name, head["etag"])
+    return path
+
+
+# =========================================================
+# MERGED DAILY OBJECT
+# =========================================================
+def _publish_object(day, name, ds, manifest, upload, pack_mode, state_lock):
+    path = os.path.join(day_dir_for(day), f"{name}_{day}.nc")
+    with _encode_lock:
+        ds.to_netcdf(path)
+        repack_netcdf(path, pack_mode)
+
+    key = archive_key(day, name)
+    upload(path, key)
+    if manifest is not None:
+        with state_lock:
+            record_upload(manifest, key, path)
+    return path
+
+
+def publish_merged_day(
+    day,
+    ds_day,
+    manifest=None,
+    upload=upload_to_s3,
+    pack_mode=PACK_MODE,
+    state_lock=None,
+    layout=ARCHIVE_LAYOUT,
+    upload_workers=UPLOAD_WORKERS
+):
+    """
+    Write one merged day (every FEATURE on the chl grid, see
+    data.compact_zarr.merged_day) as packed NetCDF, upload it next to the
+    raw files and record it in the manifest (under `state_lock` when
+    uploads are still running).
+
+    With layout="tiled" the day is split into TILE_SIZE° tiles
+    (data.tiles), uploaded concurrently. Returns the local paths.
+    """
+    state_lock = state_lock or threading.Lock()
+
+    if layout != "tiled":
+        return [_publish_object(day, MERGED_NAME, ds_day, manifest, upload, pack_mode, state_lock)]
+
+    with ThreadPoolExecutor(max_workers=upload_workers) as pool:
+        futures = [
+            pool.submit(
+                _publish_object, day, fname.removesuffix(".nc"), tile,
+                manifest, upload, pack_mode, state_lock
+            )
+            for fname, tile in split_tiles(ds_day).items()
+        ]
+        return [future.result() for future in futures]
+
+
+# =========================================================
+# PIPELINE
+# =========================================================
+def run_ingestion(
+    days,
+    bbox,
+    manifest=None,
+    journal=None,
+    client=None,
+    upload=upload_to_s3,
+    verify=head_s3,
+    on_day=None,
+    fetch_workers=FETCH_WORKERS,
+    upload_workers=UPLOAD_WORKERS,
+    batch=False,
+    state_lock=None,
+    pack_mode=PACK_MODE
+):
+    """
+    Fetch every (day, dataset) unit on a bounded process pool and upload
+    each file on a thread pool as soon as it lands, so uploads overlap
+    with the next fetches.
+
+    With `batch`, each dataset is requested once per contiguous run of
+    days (see MAX_BATCH_DAYS) and split into daily files locally, instead
+    of one request per (day, dataset).
+
+    Fetched files are re-encoded with `pack_mode` (data.repack) in the
+    fetch workers before upload; the bytes saved are reported at the end.
+
+    With a `journal` (data.ingest_journal), every unit is tracked through
+    fetched -> uploaded -> verified. Verified units are skipped, journaled
+    fetches still on local disk are uploaded without re-fetching, and a
+    re-fetched file identical to the uploaded one is only re-verified.
+    The caller persists the journal (e.g. from on_day), holding
+    `state_lock` while serializing the manifest or journal.
+
+    `on_day(day, files)` is called in the calling thread, in date order,
+    for every day whose remaining units all succeeded (files maps
+    name -> local path for the units handled in this run).
+    Returns {(day, name): exception} for failed units.
+    """
+    days = sorted(days)
+    bbox = tuple(bbox)
+
+    expected = {
+        day: {
+            name for name in DATASETS
+            if journal is None or state(journal, day, name) != VERIFIED
+        }
+        for day in days
+    }
+    files = {day: {} for day in days}
+    failures = {}
+    state_lock = state_lock or threading.Lock()
+    raw_bytes = packed_bytes = 0
+    cursor = 0
+
+    def submit_upload(day, name, path, sha256, skip_upload):
+        future = upload_pool.submit(
+            _upload_unit, day, name, path, sha256, skip_upload,
+            upload, verify, manifest, journal, state_lock
+        )
+        pending[future] = ("upload", (day,), name)
+
+    with ProcessPoolExecutor(max_workers=fetch_workers) as fetch_pool, \
+            ThreadPoolExecutor(max_workers=upload_workers) as upload_pool:
+
+        pending = {}
+        to_fetch = {name: [] for name in DATASETS}
+
+        for day in days:
+            for name in sorted(expected[day]):
+                entry = unit(journal, day, name) if journal is not None else None
+                if _resumable(entry):
+                    print(f"⏩ Resuming {name} {day} from {entry['state']} state")
+                    submit_upload(day, name, entry["path"], entry["sha256"], entry["state"] == UPLOADED)
+                else:
+                    to_fetch[name].append(day)
+
+        for name, fetch_days in to_fetch.items():
+            if batch:
+                for run in _batches(fetch_days):
+                    future = fetch_pool.submit(_fetch_range_unit, name, run, bbox, client, pack_mode)
+                    pending[future] = ("fetch", tuple(run), name)
+            else:
+                for day in fetch_days:
+                    future = fetch_pool.submit(_fetch_unit, name, day, bbox, client, pack_mode)
+                    pending[future] = ("fetch", (day,), name)
+
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in finished:
+                stage, unit_days, name = pending.pop(future)
+
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ {stage} failed for {name} {unit_days[0]}…{unit_days[-1]}: {e}")
+                    for day in unit_days:
+                        failures[(day, name)] = e
+                        if journal is not None:
+                            with state_lock:
+                                mark_failed(journal, day, name, e)
+                    continue
+
+                if stage == "fetch":
+                    returned = {d for d, *_ in result}
+                    for day in unit_days:
+                        if day not in returned:
+                            failures[(day, name)] = RuntimeError(f"{name} not returned for {day}")
+                            if journal is not None:
+                                with state_lock:
+                                    mark_failed(journal, day, name, failures[(day, name)])
+                    for d, n, path, size, sha256, raw_size in result:
+                        raw_bytes += raw_size
+                        packed_bytes += size
+                        changed = True
+                        if journal is not None:
+                            with state_lock:
+                                changed = mark_fetched(journal, d, n, path, size, sha256)
+                        if not changed:
+                            print(f"⏭️ {n} {d} unchanged, skipping upload")
+                        submit_upload(d, n, path, sha256, not changed)
+                else:
+                    files[unit_days[0]][name] = result
+
+            # Hand finished days over in date order
+            while cursor < len(days):
+                day = days[cursor]
+                if any((day, name) in failures for name in DATASETS):
+                    cursor += 1
+                    continue
+                if len(files[day]) < len(expected[day]):
+                    break
+                if on_day is not None:
+                    on_day(day, files[day])
+                cursor += 1
+
+    if raw_bytes and pack_mode != "none":
+        print(f"📦 Re-encoded as {pack_mode}: {size_report(raw_bytes, packed_bytes)}")
+
+    return failures
@@ -0,0 +1,341 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import datetime
+import tempfile
+import threading
+import traceback
+import subprocess
+from contextlib import contextmanager
+
+# =========================================================
+# CONFIG
+# =========================================================
+WORKER_DIR = os.getenv("HAB_WORKER_DIR", os.path.join(tempfile.gettempdir(), "hab_ingest"))
+STATE_FILE = "jobs.json"
+LOCK_FILE = "jobs.lock"
+# Output and tracebacks of workers started by ensure_worker
+LOG_FILE = "worker.log"
+
+POLL_SECONDS = 5
+HEARTBEAT_SECONDS = 10
+# A worker or job whose heartbeat is older than this is considered dead
+STALE_SECONDS = 6 * HEARTBEAT_SECONDS
+# A lock file older than this is left over from a crashed process
+LOCK_STALE_SECONDS = 30
+
+# Scheduled daily run (UTC hour); set HAB_SCHEDULE_HOUR=-1 to disable
+SCHEDULE_HOUR = int(os.getenv("HAB_SCHEDULE_HOUR", 6))
+
+# Finished jobs kept in the state file
+KEEP_JOBS = 20
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# =========================================================
+# PERSISTED STATE
+# =========================================================
+# WORKER_DIR/jobs.json
+# {
+#   "worker": {"id": "host:pid", "heartbeat": "…"},
+#   "last_scheduled": "2026-02-03",
+#   "jobs": [
+#     {"id": "…", "state": "running", "trigger": "manual",
+#      "created": "…", "started": "…", "finished": null, "heartbeat": "…",
+#      "progress": {"done": 3, "total": 10, "day": "2026-02-01"},
+#      "message": null}
+#   ]
+# }
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _stamp():
+    return _now().isoformat(timespec="seconds")
+
+
+def _age(stamp):
+    if not stamp:
+        return float("inf")
+    return (_now() - datetime.datetime.fromisoformat(stamp)).total_seconds()
+
+
+def _path(name):
+    return os.path.join(WORKER_DIR, name)
+
+
+@contextmanager
+def _locked():
+    """
+    Cross-process lock on the state file (O_EXCL lock file, portable
+    across platforms). Lock files left by crashed processes are broken
+    after LOCK_STALE_SECONDS.
+    """
+    os.makedirs(WORKER_DIR, exist_ok=True)
+    lock = _path(LOCK_FILE)
+    while True:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.close(fd)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) > LOCK_STALE_SECONDS:
+                    os.remove(lock)
+                    continue
+            except OSError:
+                continue
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.remove(lock)
+
+
+def _read_state():
+    try:
+        with open(_path(STATE_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"worker": None, "last_scheduled": None, "jobs": []}
+
+
+def _write_state(state):
+    tmp = _path(f"{STATE_FILE}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp, _path(STATE_FILE))
+
+
+def _worker_alive(state):
+    worker = state.get("worker")
+    return bool(worker) and _age(worker.get("heartbeat")) < STALE_SECONDS
+
+
+def _reap(state):
+    """
+    Fail running jobs whose worker stopped sending heartbeats, and queued
+    jobs no worker picked up within STALE_SECONDS (e.g. it died at startup).
+    """
+    alive = _worker_alive(state)
+    for job in state["jobs"]:
+        if job["state"] == RUNNING and _age(job.get("heartbeat")) > STALE_SECONDS:
+            job.update(state=FAILED, finished=_stamp(),
+                       message=f"❌ Worker stopped responding (see {_path(LOG_FILE)})")
+        elif job["state"] == QUEUED and not alive and _age(job.get("created")) > STALE_SECONDS:
+            job.update(state=FAILED, finished=_stamp(),
+                       message=f"❌ No ingest worker picked the job up (see {_path(LOG_FILE)})")
+
+
+def _active(state):
+    return next((job for job in state["jobs"] if job["state"] in (QUEUED, RUNNING)), None)
+
+
+def _enqueue(state, trigger):
+    job = {
+        "id": uuid.uuid4().hex[:12],
+        "state": QUEUED,
+        "trigger": trigger,
+        "created": _stamp(),
+        "started": None,
+        "finished": None,
+        "heartbeat": None,
+        "progress": None,
+        "message": None,
+    }
+    finished = [j for j in state["jobs"] if j["state"] in (DONE, FAILED)]
+    state["jobs"] = finished[-KEEP_JOBS:] + [j for j in state["jobs"] if j["state"] in (QUEUED, RUNNING)]
+    state["jobs"].append(job)
+    return job
+
+
+def _update_job(job_id, **fields):
+    with _locked():
+        state = _read_state()
+        for job in state["jobs"]:
+            if job["id"] == job_id:
+                job.update(fields)
+        _write_state(state)
+
+
+# =========================================================
+# STATUS API (used by the dashboard)
+# =========================================================
+def submit_job(trigger="manual"):
+    """
+    Queue an ingestion run and return its job. While a run is queued or
+    running, that job is returned instead, so concurrent submits from
+    several sessions result in exactly one run.
+    """
+    with _locked():
+        state = _read_state()
+        _reap(state)
+        job = _active(state) or _enqueue(state, trigger)
+        _write_state(state)
+    return job
+
+
+def job_status(job_id=None):
+    """One job (default: the active one, else the latest), or None."""
+    with _locked():
+        state = _read_state()
+        _reap(state)
+    jobs = state["jobs"]
+    if job_id is not None:
+        return next((job for job in jobs if job["id"] == job_id), None)
+    return _active(state) or (jobs[-1] if jobs else None)
+
+
+def worker_alive():
+    return _worker_alive(_read_state())
+
+
+def ensure_worker():
+    """
+    Start a background worker process unless one is already alive. Its
+    output goes to WORKER_DIR/worker.log.
+    """
+    if worker_alive():
+        return False
+    os.makedirs(WORKER_DIR, exist_ok=True)
+    with open(_path(LOG_FILE), "ab") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "data.ingest_worker", "serve"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            env={**os.environ, "PYTHONUNBUFFERED": "1"},
+            start_new_session=True,
+        )
+    return True
+
+
+# =========================================================
+# WORKER
+# =========================================================
+class IngestWorker:
+    """
+    Runs queued ingestion jobs one at a time and queues a scheduled run
+    once a day after SCHEDULE_HOUR (UTC). Only one worker serves the
+    queue: a second one exits while the first keeps its heartbeat.
+    """
+
+    def __init__(self, run=None):
+        self.id = f"{socket.gethostname()}:{os.getpid()}"
+        self.run = run
+        self.job_id = None
+        self._stop = threading.Event()
+
+    def _claim_worker(self):
+        with _locked():
+            state = _read_state()
+            worker = state.get("worker")
+            if worker and worker["id"] != self.id and _age(worker.get("heartbeat")) < STALE_SECONDS:
+                return False
+            state["worker"] = {"id": self.id, "heartbeat": _stamp()}
+            _write_state(state)
+        return True
+
+    def _heartbeat(self):
+        while not self._stop.wait(HEARTBEAT_SECONDS):
+            with _locked():
+                state = _read_state()
+                state["worker"] = {"id": self.id, "heartbeat": _stamp()}
+                for job in state["jobs"]:
+                    if job["id"] == self.job_id:
+                        job["heartbeat"] = _stamp()
+                _write_state(state)
+
+    def _next_job(self):
+        """Claim the queued job, queueing the daily scheduled run when due."""
+        with _locked():
+            state = _read_state()
+            _reap(state)
+
+            today = _now().date().isoformat()
+            due = 0 <= SCHEDULE_HOUR <= _now().hour and state.get("last_scheduled") != today
+            if due and _active(state) is None:
+                _enqueue(state, "scheduled")
+                state["last_scheduled"] = today
+
+            job = next((j for j in state["jobs"] if j["state"] == QUEUED), None)
+            if job is not None:
+                job.update(state=RUNNING, started=_stamp(), heartbeat=_stamp())
+            _write_state(state)
+        return job
+
+    def _run_job(self, job):
+        self.job_id = job["id"]
+
+        def progress(done, total, day):
+            _update_job(job["id"], progress={"done": done, "total": total, "day": str(day)})
+
+        try:
+            if self.run is None:
+                from data.update_database import update_database
+                message = update_database(progress=progress)
+            else:
+                message = self.run(progress=progress)
+            _update_job(job["id"], state=DONE, finished=_stamp(), message=message)
+        except Exception as e:
+            traceback.print_exc()
+            _update_job(job["id"], state=FAILED, finished=_stamp(), message=f"❌ {e}")
+        finally:
+            self.job_id = None
+
+    def serve(self, once=False):
+        """Process jobs until stopped; with `once`, exit when the queue is empty."""
+        if not self._claim_worker():
+            print("⏭️ Another ingest worker is alive")
+            return
+
+        heartbeat = threading.Thread(target=self._heartbeat, daemon=True)
+        heartbeat.start()
+        try:
+            while not self._stop.is_set():
+                job = self._next_job()
+                if job is not None:
+                    print(f"📥 Running {job['trigger']} ingestion job {job['id']}")
+                    self._run_job(job)
+                elif once:
+                    break
+                else:
+                    self._stop.wait(POLL_SECONDS)
+        finally:
+            self._stop.set()
+            with _locked():
+                state = _read_state()
+                if (state.get("worker") or {}).get("id") == self.id:
+                    state["worker"] = None
+                _write_state(state)
+
+    def stop(self):
+        self._stop.set()
+
+
+# =========================================================
+# CLI
+#   python -m data.ingest_worker serve     (long-running, scheduled runs)
+#   python -m data.ingest_worker once      (drain the queue and exit)
+#   python -m data.ingest_worker submit
+#   python -m data.ingest_worker status
+# =========================================================
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "serve"
+
+    if command in ("serve", "once"):
+        IngestWorker().serve(once=command == "once")
+
+    elif command == "submit":
+        print(json.dumps(submit_job(), indent=1))
+
+    elif command == "status":
+        print(json.dumps(job_status(), indent=1))
+
+    else:
+        raise SystemExit(f"Unknown command: {command}")
@@ -0,0 +1,88 @@
+import os
+import time
+import datetime
+import numpy as np
+import xarray as xr
+
+# =========================================================
+# OFFLINE STAND-IN FOR copernicusmarine
+# =========================================================
+# Same `subset` signature, writes synthetic fields on the right grids so
+# the ingestion pipeline can be run and benchmarked without credentials
+# or network access.
+
+GRID_STEP = {"0.25deg": 0.25, "0.083deg": 1 / 12}
+
+
+def _grid_step(dataset_id):
+    for tag, step in GRID_STEP.items():
+        if tag in dataset_id:
+            return step
+    return 0.25
+
+
+def _field(var, rng, shape):
+    if var == "sea_surface_temperature_anomaly":
+        return rng.normal(0.3, 0.7, shape)
+    if var in ("uo", "vo"):
+        return rng.normal(0.0, 0.13, shape)
+    # biogeochemistry: positive, skewed
+    return rng.lognormal(-1.5, 0.8, shape)
+
+
+class LocalCopernicusClient:
+    """
+    `latency` seconds are slept per request to mimic the server-side job
+    and transfer time of a real subset call.
+    """
+
+    def __init__(self, latency=0.0, seed=0):
+        self.latency = latency
+        self.seed = seed
+
+    def subset(
+        self,
+        dataset_id,
+        variables,
+        minimum_latitude,
+        maximum_latitude,
+        minimum_longitude,
+        maximum_longitude,
+        start_datetime,
+        end_datetime,
+        output_directory,
+        output_filename,
+        minimum_depth=None,
+        maximum_depth=None,
+        **_
+    ):
+        time.sleep(self.latency)
+
+        step = _grid_step(dataset_id)
+        lat = np.arange(minimum_latitude, maximum_latitude + step / 2, step, dtype="float32")
+        lon = np.arange(minimum_longitude, maximum_longitude + step / 2, step, dtype="float32")
+
+        start = datetime.date.fromisoformat(str(start_datetime)[:10])
+        end = datetime.date.fromisoformat(str(end_datetime)[:10])
+        times = np.arange(
+            np.datetime64(start), np.datetime64(end) + np.timedelta64(1, "D"),
+            dtype="datetime64[D]"
+        ).astype("datetime64[ns]")
+
+        rng = np.random.default_rng([self.seed, start.toordinal(), len(dataset_id)])
+
+        dims = ("time", "latitude", "longitude")
+        shape = (times.size, lat.size, lon.size)
+        coords = {"time": times, "latitude": lat, "longitude": lon}
+        if minimum_depth is not None:
+            dims = ("time", "depth", "latitude", "longitude")
+            shape = (times.size, 1, lat.size, lon.size)
+            coords["depth"] = np.array([0.494], dtype="float32")
+
+        ds = xr.Dataset(
+            {var: (dims, _field(var, rng, shape).astype("float32")) for var in variables},
+            coords=coords
+        )
+
+        os.makedirs(output_directory, exist_ok=True)
+        ds.to_netcdf(os.path.join(output_directory, output_filename))
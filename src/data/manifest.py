@@ -0,0 +1,181 @@
+import sys
+import json
+import hashlib
+import datetime
+from data.storage import NotFound, get_storage
+
+# =========================================================
+# CONFIG
+# =========================================================
+PREFIX = "daily/"
+MANIFEST_KEY = "manifest.json"
+
+DAILY_FILES = ["pft.nc", "nut.nc", "bio.nc", "sst.nc", "cur.nc"]
+
+# Pre-merged daily objects (merged.nc or merged_<lat0>_<lon0>.nc tiles);
+# a day that has them is complete even once its raw files are dropped
+ROLLUP_PREFIX = "merged"
+
+# =========================================================
+# ARCHIVE MANIFEST
+# =========================================================
+# {
+#   "version": 1,
+#   "updated": "2026-02-03T06:00:00",
+#   "days": {
+#     "2026-02-01": {
+#       "pft.nc": {"size": 123, "etag": "\"…\"", "sha256": "…"},
+#       ...
+#     }
+#   }
+# }
+
+
+def empty_manifest():
+    return {"version": 1, "updated": None, "days": {}}
+
+
+def load_manifest():
+    """Fetch the manifest with a single GET. Returns None if it does not exist."""
+    try:
+        body = get_storage().get(MANIFEST_KEY)
+    except NotFound:
+        return None
+    return json.loads(body)
+
+
+def save_manifest(manifest):
+    manifest["updated"] = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    get_storage().put(
+        MANIFEST_KEY,
+        json.dumps(manifest, sort_keys=True).encode(),
+        content_type="application/json",
+    )
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def parse_key(key):
+    """daily/YYYY/MM/DD/file.nc -> (date, file) or None"""
+    parts = key.split("/")
+    if len(parts) != 5 or parts[0] + "/" != PREFIX:
+        return None
+    try:
+        y, m, d = map(int, parts[1:4])
+        return datetime.date(y, m, d), parts[4]
+    except ValueError:
+        return None
+
+
+def record_upload(manifest, s3_key, local_path, head=None, sha256=None):
+    """
+    Add one freshly uploaded daily object to the manifest (in memory).
+    `head` / `sha256` reuse a head() result and checksum the caller already has.
+    """
+    parsed = parse_key(s3_key)
+    if parsed is None:
+        raise ValueError(f"Not a daily archive key: {s3_key}")
+    day, fname = parsed
+
+    if head is None:
+        head = get_storage().head(s3_key)
+    manifest["days"].setdefault(day.isoformat(), {})[fname] = {
+        "size": head["size"],
+        "etag": head["etag"],
+        "sha256": sha256 or file_sha256(local_path),
+    }
+
+
+def rebuild_manifest(save=True):
+    """
+    Recovery: rebuild the manifest from a full paginated listing of the
+    archive. Checksums are not available from a listing and are left empty.
+    Read-only callers pass save=False to keep the result to themselves.
+    """
+    manifest = empty_manifest()
+
+    for obj in get_storage().list(PREFIX):
+        parsed = parse_key(obj["key"])
+        if parsed is None:
+            continue
+        day, fname = parsed
+        manifest["days"].setdefault(day.isoformat(), {})[fname] = {
+            "size": obj["size"],
+            "etag": obj["etag"],
+            "sha256": None,
+        }
+
+    if save:
+        save_manifest(manifest)
+    return manifest
+
+
+# =========================================================
+# QUERIES
+# =========================================================
+def day_files(manifest, day):
+    """{fname: entry} for one date (empty when the day is not archived)."""
+    return manifest["days"].get(day.isoformat(), {})
+
+
+def rolled_up(files):
+    return any(f.startswith(ROLLUP_PREFIX) for f in files)
+
+
+def _missing(files):
+    if rolled_up(files):
+        return []
+    return [f for f in DAILY_FILES if f not in files]
+
+
+def last_date(manifest, complete_only=False):
+    dates = [
+        datetime.date.fromisoformat(d)
+        for d, files in manifest["days"].items()
+        if not complete_only or not _missing(files)
+    ]
+    return max(dates) if dates else None
+
+
+def find_gaps(manifest, start_date, end_date):
+    """
+    [(date, [missing files])] for every incomplete day in the range.
+    Rolled-up days (see ROLLUP_PREFIX) are complete.
+    """
+    gaps = []
+    current = start_date
+    while current <= end_date:
+        missing = _missing(day_files(manifest, current))
+        if missing:
+            gaps.append((current, missing))
+        current += datetime.timedelta(days=1)
+    return gaps
+
+
+# =========================================================
+# CLI
+#   python -m data.manifest rebuild
+#   python -m data.manifest gaps 2026-01-01 2026-02-01
+# =========================================================
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "rebuild"
+
+    if command == "rebuild":
+        m = rebuild_manifest()
+        print(f"✅ Manifest rebuilt: {len(m['days'])} days, latest {last_date(m)}")
+
+    elif command == "gaps":
+        m = load_manifest() or rebuild_manifest()
+        start = datetime.date.fromisoformat(sys.argv[2])
+        end = datetime.date.fromisoformat(sys.argv[3])
+        for day, missing in find_gaps(m, start, end):
+            print(f"⚠️ {day}: missing {', '.join(missing)}")
+
+    else:
+        raise SystemExit(f"Unknown command: {command}")
@@ -0,0 +1,182 @@
+import os
+import hashlib
+import threading
+import numpy as np
+import xarray as xr
+from data.s3_cache import CACHE_DIR
+
+# =========================================================
+# CONFIG
+# =========================================================
+REGRID_CACHE_DIR = os.path.join(CACHE_DIR, "regrid")
+METHODS = ("nearest", "block_mean")
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+# =========================================================
+# INDEX CONSTRUCTION
+# =========================================================
+def _nearest_1d(src, tgt, max_distance=None):
+    """
+    Index of the nearest `src` coordinate for every `tgt` coordinate.
+    Targets outside the source extent (or further than `max_distance`)
+    get -1, matching xarray's nearest interp which returns NaN there.
+    """
+    src = np.asarray(src, dtype="float64")
+    tgt = np.asarray(tgt, dtype="float64")
+
+    order = np.argsort(src, kind="stable")
+    s = src[order]
+
+    pos = np.searchsorted(s, tgt)
+    left = np.clip(pos - 1, 0, s.size - 1)
+    right = np.clip(pos, 0, s.size - 1)
+    pick = np.where(np.abs(s[right] - tgt) < np.abs(tgt - s[left]), right, left)
+
+    idx = order[pick]
+    if max_distance is None:
+        outside = (tgt < s[0]) | (tgt > s[-1])
+    else:
+        outside = np.abs(src[idx] - tgt) > max_distance
+    idx[outside] = -1
+    return idx
+
+
+def _half_spacing(coord):
+    coord = np.asarray(coord, dtype="float64")
+    return np.abs(np.diff(coord)).max() / 2 if coord.size > 1 else np.inf
+
+
+def _build_index(src_lat, src_lon, tgt_lat, tgt_lon, method):
+    if method == "nearest":
+        # target cell -> source cell
+        return {
+            "lat": _nearest_1d(src_lat, tgt_lat),
+            "lon": _nearest_1d(src_lon, tgt_lon),
+        }
+
+    # block_mean: source cell -> target cell it falls into
+    return {
+        "lat": _nearest_1d(tgt_lat, src_lat, _half_spacing(tgt_lat)),
+        "lon": _nearest_1d(tgt_lon, src_lon, _half_spacing(tgt_lon)),
+    }
+
+
+def _grid_key(src_lat, src_lon, tgt_lat, tgt_lon, method):
+    h = hashlib.sha256(method.encode())
+    for coord in (src_lat, src_lon, tgt_lat, tgt_lon):
+        arr = np.ascontiguousarray(coord, dtype="float64")
+        h.update(str(arr.size).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def get_index(src_lat, src_lon, tgt_lat, tgt_lon, method="nearest"):
+    """
+    Regridding index for one grid pair, computed once and cached
+    in memory and on disk (REGRID_CACHE_DIR/<sha256>.npz).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown regrid method {method!r}, expected one of {METHODS}")
+
+    key = _grid_key(src_lat, src_lon, tgt_lat, tgt_lon, method)
+
+    with _lock:
+        if key in _indexes:
+            return _indexes[key]
+
+    path = os.path.join(REGRID_CACHE_DIR, f"{key}.npz")
+    try:
+        with np.load(path) as f:
+            index = {"lat": f["lat"], "lon": f["lon"]}
+    except (OSError, KeyError, ValueError):
+        index = _build_index(src_lat, src_lon, tgt_lat, tgt_lon, method)
+        try:
+            os.makedirs(REGRID_CACHE_DIR, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                np.savez(f, **index)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    with _lock:
+        _indexes[key] = index
+    return index
+
+
+# =========================================================
+# APPLY
+# =========================================================
+def _gather(values, index):
+    """Vectorized nearest-neighbour gather over the last two axes."""
+    lat_idx, lon_idx = index["lat"], index["lon"]
+
+    if not np.issubdtype(values.dtype, np.floating):
+        values = values.astype("float64")
+
+    out = values.take(np.maximum(lat_idx, 0), axis=-2)
+    out = out.take(np.maximum(lon_idx, 0), axis=-1)
+
+    out[..., lat_idx < 0, :] = np.nan
+    out[..., :, lon_idx < 0] = np.nan
+    return out
+
+
+def _block_mean(values, index, shape):
+    """Mean of all finite source cells falling inside each target cell."""
+    lat_idx, lon_idx = index["lat"], index["lon"]
+    n_lat, n_lon = shape
+
+    target = lat_idx[:, None] * n_lon + lon_idx[None, :]
+    target[(lat_idx < 0)[:, None] | (lon_idx < 0)[None, :]] = -1
+
+    lead = values.shape[:-2]
+    flat = values.reshape(-1, *values.shape[-2:]).astype("float64")
+    out = np.empty((flat.shape[0], n_lat * n_lon))
+
+    for i, field in enumerate(flat):
+        valid = np.isfinite(field) & (target >= 0)
+        sums = np.bincount(target[valid], weights=field[valid], minlength=n_lat * n_lon)
+        counts = np.bincount(target[valid], minlength=n_lat * n_lon)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[i] = sums / counts
+
+    dtype = values.dtype if np.issubdtype(values.dtype, np.floating) else "float64"
+    return out.reshape(*lead, n_lat, n_lon).astype(dtype)
+
+
+def regrid_to(ds, target_lat, target_lon, method="nearest"):
+    """
+    Regrid every (…, latitude, longitude) variable of `ds` onto the target
+    grid. "nearest" reproduces ds.interp(method="nearest"); "block_mean"
+    averages all source cells that fall inside each target cell
+    (conservative for coarser targets).
+    """
+    index = get_index(
+        ds.latitude.values, ds.longitude.values,
+        np.asarray(target_lat), np.asarray(target_lon),
+        method
+    )
+    shape = (np.size(target_lat), np.size(target_lon))
+
+    data_vars = {}
+    for name, da in ds.data_vars.items():
+        if da.dims[-2:] != ("latitude", "longitude"):
+            continue
+        if method == "nearest":
+            values = _gather(da.values, index)
+        else:
+            values = _block_mean(da.values, index, shape)
+        data_vars[name] = (da.dims, values, da.attrs)
+
+    coords = {
+        name: coord for name, coord in ds.coords.items()
+        if "latitude" not in coord.dims and "longitude" not in coord.dims
+    }
+    coords["latitude"] = target_lat
+    coords["longitude"] = target_lon
+
+    return xr.Dataset(data_vars, coords=coords, attrs=ds.attrs)
@@ -0,0 +1,124 @@
+import os
+import sys
+import numpy as np
+import xarray as xr
+
+# =========================================================
+# CONFIG
+# =========================================================
+# "quantize": float32 with the trailing mantissa bits zeroed + zlib;
+#             relative error within half a unit of the last kept digit,
+#             5 * 10^-QUANTIZE_DIGITS
+# "int16": CF-packed int16 (scale_factor / add_offset) + zlib, opt-in;
+#          absolute error up to half a packing step, (max - min) / (4 * PACKED_MAX)
+#          of each file, and merged objects built from such files are packed
+#          again on their own range
+# "none": upload what copernicusmarine produced
+PACK_MODE = os.getenv("HAB_PACK_MODE", "quantize")
+PACK_MODES = ("int16", "quantize", "none")
+
+COMPLEVEL = 4
+
+# int16 range used for data; -32767 is left free as the fill value
+PACKED_MAX = 32000
+FILL_VALUE = np.int16(-32767)
+
+# netCDF's default float fill: a NaN fill would go through the bit
+# rounding and come back as 0
+FLOAT_FILL_VALUE = np.float32(9.96921e36)
+
+# Significant decimal digits kept in "quantize" mode
+QUANTIZE_DIGITS = 4
+
+
+# =========================================================
+# ENCODINGS
+# =========================================================
+def _packed_encoding(values):
+    """CF scale/offset mapping the finite range of `values` onto ±PACKED_MAX."""
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        vmin = vmax = 0.0
+    else:
+        vmin, vmax = float(finite.min()), float(finite.max())
+
+    scale = (vmax - vmin) / (2 * PACKED_MAX) or 1.0
+    return {
+        "dtype": "int16",
+        "scale_factor": np.float32(scale),
+        "add_offset": np.float32((vmax + vmin) / 2),
+        "_FillValue": FILL_VALUE,
+    }
+
+
+def _encoding(da, mode):
+    encoding = {"zlib": True, "complevel": COMPLEVEL, "shuffle": True}
+
+    if mode == "int16":
+        encoding.update(_packed_encoding(da.values))
+    else:
+        encoding.update(
+            dtype="float32",
+            _FillValue=FLOAT_FILL_VALUE,
+            significant_digits=QUANTIZE_DIGITS,
+            quantize_mode="GranularBitRound",
+        )
+    return encoding
+
+
+# =========================================================
+# REPACK
+# =========================================================
+def repack_netcdf(path, mode=PACK_MODE):
+    """
+    Re-encode one NetCDF in place: every data variable compressed with zlib
+    and stored as packed int16 or quantized float32 (see PACK_MODE).
+    Coordinates are kept as they are. Returns (bytes_before, bytes_after).
+    """
+    if mode not in PACK_MODES:
+        raise ValueError(f"Unknown pack mode {mode!r}, expected one of {PACK_MODES}")
+
+    before = os.path.getsize(path)
+    if mode == "none":
+        return before, before
+
+    with xr.open_dataset(path) as ds:
+        ds = ds.load()
+
+    for var in ds.variables.values():
+        var.encoding = {}
+
+    encoding = {name: _encoding(da, mode) for name, da in ds.data_vars.items()}
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        ds.to_netcdf(tmp, engine="netcdf4", encoding=encoding)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    return before, os.path.getsize(path)
+
+
+def size_report(before, after):
+    saved = before - after
+    pct = 100 * saved / before if before else 0.0
+    return f"{before / 1e6:.1f} MB → {after / 1e6:.1f} MB ({saved / 1e6:.1f} MB, {pct:.0f}% saved)"
+
+
+# =========================================================
+# CLI:  python -m data.repack [int16|quantize] file.nc ...
+# =========================================================
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    mode = args.pop(0) if args and args[0] in PACK_MODES else PACK_MODE
+
+    total_before = total_after = 0
+    for path in args:
+        before, after = repack_netcdf(path, mode)
+        total_before += before
+        total_after += after
+        print(f"📦 {path}: {size_report(before, after)}")
+
+    print(f"📦 Total: {size_report(total_before, total_after)}")
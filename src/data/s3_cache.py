@@ -0,0 +1,284 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from data.storage import get_storage
+
+# =========================================================
+# CONFIG
+# =========================================================
+CACHE_DIR = os.getenv(
+    "HAB_CACHE_DIR", os.path.join(tempfile.gettempdir(), "hab_s3_cache")
+)
+CACHE_MAX_BYTES = int(os.getenv("HAB_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+
+# The cache directory is shared by every process (dashboard, ingest
+# worker, CLIs). Temp files and unindexed entries younger than this may
+# belong to a download or index flush still in progress elsewhere.
+ORPHAN_SECONDS = 3600
+# A lock file older than this is left over from a crashed process
+LOCK_STALE_SECONDS = 30
+
+
+# =========================================================
+# PERSISTENT S3 OBJECT CACHE
+# =========================================================
+class S3ObjectCache:
+    """
+    Content-addressed on-disk cache for S3 objects.
+
+    Entries are keyed by (S3 key, ETag) and stored as
+    sha256(key + etag) files inside `cache_dir`. Writes are atomic
+    (temp file + os.replace), the total size is kept under `max_bytes`
+    by evicting the least recently used entries.
+
+    A cached key is served without any network I/O unless the caller
+    asks for revalidation, in which case a HEAD request compares ETags.
+
+    Several processes may share `cache_dir`: the index is merged with the
+    one on disk under a lock file on every flush, and only files older
+    than ORPHAN_SECONDS are ever swept as orphans.
+    """
+
+    def __init__(self, storage=None, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self._storage = storage
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._read_index()
+        self._remove_orphans()
+
+    # -----------------------------------------------------
+    # Index persistence
+    # -----------------------------------------------------
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    @contextmanager
+    def _index_locked(self):
+        """Cross-process lock on the index file (O_EXCL lock file)."""
+        lock = os.path.join(self.cache_dir, LOCK_FILE)
+        while True:
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock) > LOCK_STALE_SECONDS:
+                        os.remove(lock)
+                        continue
+                except OSError:
+                    continue
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            os.remove(lock)
+
+    def _read_index(self):
+        try:
+            with open(self._index_path(), "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        # Drop entries whose file disappeared
+        return {
+            key: entry for key, entry in index.items()
+            if os.path.exists(os.path.join(self.cache_dir, entry["file"]))
+        }
+
+    def _remove_orphans(self):
+        """Sweep temp files and unindexed entries nobody has touched for ORPHAN_SECONDS."""
+        known = {entry["file"] for entry in self._index.values()}
+        known.update((INDEX_FILE, LOCK_FILE))
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if (
+                    name not in known
+                    and os.path.isfile(path)
+                    and now - os.path.getmtime(path) > ORPHAN_SECONDS
+                ):
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def flush(self):
+        """
+        Persist the index (no-op when nothing changed): merged with the
+        index other processes wrote, under the index lock, then replaced
+        atomically. The merged view becomes this process's index.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            with self._index_locked():
+                # Both sides only keep entries whose file still exists; for
+                # a key known to both, the most recently used entry wins
+                index = self._read_index()
+                for key, entry in self._index.items():
+                    other = index.get(key)
+                    if not os.path.exists(os.path.join(self.cache_dir, entry["file"])):
+                        continue
+                    if other is None or entry["atime"] >= other["atime"]:
+                        index[key] = entry
+
+                self._index = index
+                self._evict(keep=None)
+
+                fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+                with os.fdopen(fd, "w") as f:
+                    json.dump(self._index, f)
+                os.replace(tmp, self._index_path())
+            self._dirty = False
+
+    # -----------------------------------------------------
+    # Helpers
+    # -----------------------------------------------------
+    @property
+    def storage(self):
+        """The backend given at construction, else the configured one (data.storage)."""
+        return self._storage or get_storage()
+
+    @staticmethod
+    def _entry_name(s3_key, etag):
+        digest = hashlib.sha256(f"{s3_key}\0{etag}".encode()).hexdigest()
+        return f"{digest}.nc"
+
+    def _remote_etag(self, s3_key):
+        return self.storage.head(s3_key)["etag"]
+
+    def _evict(self, keep):
+        total = sum(entry["size"] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+
+        for key in sorted(self._index, key=lambda k: self._index[k]["atime"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            entry = self._index.pop(key)
+            total -= entry["size"]
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except OSError:
+                pass
+
+    # -----------------------------------------------------
+    # Public API
+    # -----------------------------------------------------
+    def get(self, s3_key, revalidate=False, etag=None):
+        """
+        Return a local path holding the current contents of `s3_key`,
+        downloading the object only on a cache miss.
+
+        A known `etag` (e.g. from the archive manifest) validates the entry
+        without any request; otherwise `revalidate` issues a HEAD.
+        """
+        with self._lock:
+            entry = self._index.get(s3_key)
+
+        if entry is not None and etag is not None:
+            if etag != entry["etag"]:
+                entry = None
+        elif entry is not None and revalidate:
+            if self._remote_etag(s3_key) != entry["etag"]:
+                entry = None
+
+        if entry is not None:
+            path = os.path.join(self.cache_dir, entry["file"])
+            if os.path.exists(path):
+                with self._lock:
+                    entry["atime"] = time.time()
+                    self.hits += 1
+                    self._dirty = True
+                return path
+
+        return self._download(s3_key)
+
+    def _download(self, s3_key):
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            etag = self.storage.download(s3_key, tmp)
+            name = self._entry_name(s3_key, etag)
+            path = os.path.join(self.cache_dir, name)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        with self._lock:
+            old = self._index.get(s3_key)
+            if old is not None and old["file"] != name:
+                try:
+                    os.remove(os.path.join(self.cache_dir, old["file"]))
+                except OSError:
+                    pass
+
+            self._index[s3_key] = {
+                "etag": etag,
+                "file": name,
+                "size": os.path.getsize(path),
+                "atime": time.time(),
+            }
+            self.misses += 1
+            self._dirty = True
+            self._evict(keep=s3_key)
+
+        return path
+
+    def stats(self):
+        """Hit/miss counters and current footprint."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._index),
+                "bytes": sum(entry["size"] for entry in self._index.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+# =========================================================
+# SHARED CACHE
+# =========================================================
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    The process-wide cache, created on first use: importing the loader
+    creates no directory and sweeps nothing.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = S3ObjectCache()
+        return _cache
+
+
+def set_cache(cache):
+    """Swap the process-wide cache (benchmarks, tests)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
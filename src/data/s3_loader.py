@@ -1,21 +1,478 @@
-import boto3
 import xarray as xr
 import numpy as np
 import tempfile
+import io
 import os
+import time
 import datetime
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from data.s3_cache import get_cache
+from data.regrid import regrid_to
+from data.manifest import load_manifest, day_files
+from data.storage import NotFound, get_storage
+from data.tiles import parse_tile, stitch_tiles, tile_intersects
 
 # =========================================================
 # CONFIG
 # =========================================================
-BUCKET = "hab-bloom-db-2026"
 PREFIX = "daily/"
 
-s3 = boto3.client("s3")
+# Concurrent fetch engine
+MAX_WORKERS = 16        # parallel S3 objects in flight
+MAX_RETRIES = 3         # retries per object (missing keys are never retried)
+RETRY_BACKOFF = 0.5     # seconds, doubled after every failed attempt
+
+# Local object cache: days older than this are served without touching S3
+REVALIDATE_DAYS = 3
+
+# Zero-disk decoding: objects are read into memory and decoded with h5netcdf
+IN_MEMORY = os.getenv("HAB_IN_MEMORY", "0") == "1"
+MEMORY_ENGINE = "h5netcdf"
+
+# Chunked Zarr cube compacted from the daily archive (see data.compact_zarr).
+# Either an s3:// URL (needs s3fs) or a local path; empty means cube.zarr
+# in the configured storage backend (see zarr_store).
+ZARR_STORE = os.getenv("HAB_ZARR_STORE", "")
+SOURCE = os.getenv("HAB_SOURCE", "netcdf")   # "netcdf" | "zarr"
+
+# Regridding of the 0.083° files onto the chl grid (see data.regrid)
+REGRID_METHOD = os.getenv("HAB_REGRID", "nearest")   # "nearest" | "block_mean"
+
+# Loaded cubes are stored in single precision
+CUBE_DTYPE = "float32"
+
+# Lazy reads of the Zarr cube: days per chunk along time
+LAZY_TIME_CHUNK = 8
+
+# Extra margin (degrees) kept around the bbox on files that still need
+# regridding, so edge cells have their nearest source neighbours
+HALO = 0.5
+
+FILES = {
+    "pft.nc": ["chl", "phyc"],   # ⭐ load TWO vars from same file
+    "nut.nc": ["no3", "po4"],
+    "bio.nc": ["nppv"],
+    "sst.nc": ["sea_surface_temperature_anomaly"],
+    "cur.nc": ["uo", "vo"],
+}
+
+# One object per day with every variable already on the chl grid, written
+# at ingest (see data.ingest_pipeline.publish_merged_day). Preferred over
+# the five raw files whenever the manifest lists it.
+MERGED_FILE = "merged.nc"
+
+# The netCDF-C/HDF5 libraries are not thread-safe: downloads run in
+# parallel, decoding is serialized
+_decode_lock = threading.Lock()
+
+
+def _with_retries(fn, *args, **kwargs):
+    """
+    Call `fn`, retrying transient failures with exponential backoff.
+    A missing key (404) is raised immediately.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return fn(*args, **kwargs)
+        except NotFound:
+            raise
+        except Exception:
+            if attempt == MAX_RETRIES:
+                raise
+        time.sleep(RETRY_BACKOFF * 2 ** attempt)
 
 
 def _download_from_s3(s3_key, local_path):
-    s3.download_file(BUCKET, s3_key, local_path)
+    _with_retries(get_storage().download, s3_key, local_path)
+
+
+def _read_from_s3(s3_key):
+    """Read one object body into memory."""
+    return _with_retries(get_storage().get, s3_key)
+
+
+def zarr_store():
+    """
+    Location of the Zarr cube: HAB_ZARR_STORE, else cube.zarr in the
+    storage backend configured right now (so set_storage reaches it).
+    """
+    return ZARR_STORE or get_storage().url("cube.zarr")
+
+
+def _day_prefix(day):
+    return f"{PREFIX}{day.strftime('%Y/%m/%d')}/"
+
+
+# =========================================================
+# FETCH + DECODE (runs in worker threads)
+# =========================================================
+def _read_manifest():
+    """Archive manifest (one GET), or None to probe every object instead."""
+    try:
+        return _with_retries(load_manifest)
+    except Exception as e:
+        print(f"⚠️ Manifest unavailable, probing objects directly: {e}")
+        return None
+
+
+def _available_files(manifest, day, bbox=None):
+    """
+    {fname: etag} of the day's objects: the merged tiles intersecting
+    `bbox` when the day is tiled (see data.tiles), else the merged object
+    when it exists, else the raw files. Every raw file (etag None)
+    without a manifest.
+    """
+    if manifest is None:
+        return {fname: None for fname in FILES}
+    entries = day_files(manifest, day)
+    tiles = [fname for fname in entries if parse_tile(fname) is not None]
+    if tiles:
+        return {
+            fname: entries[fname]["etag"] for fname in tiles
+            if bbox is None or tile_intersects(fname, bbox)
+        }
+    if MERGED_FILE in entries:
+        return {MERGED_FILE: entries[MERGED_FILE]["etag"]}
+    return {fname: entries[fname]["etag"] for fname in FILES if fname in entries}
+
+
+def _fetch_file(day, fname, use_cache, in_memory, bbox, etag=None, variables=None):
+    """
+    Download and decode one daily object, subset to `bbox` (and to
+    `variables` when given).
+    Returns the Dataset with depth/time removed, fully loaded into memory.
+    """
+    key = _day_prefix(day) + fname
+
+    # The chl file defines the master grid and is cut exactly, as are
+    # the merged file and its tiles which are already on it
+    halo = 0 if fname not in FILES or "chl" in FILES[fname] else HALO
+
+    if in_memory:
+        source = io.BytesIO(_read_from_s3(key))
+        return open_daily_file(source, engine=MEMORY_ENGINE, bbox=bbox, halo=halo, variables=variables)
+
+    if use_cache:
+        recent = day >= datetime.date.today() - datetime.timedelta(days=REVALIDATE_DAYS)
+        local = _with_retries(get_cache().get, key, revalidate=recent, etag=etag)
+        return open_daily_file(local, bbox=bbox, halo=halo, variables=variables)
+
+    # Private temp file so concurrent sessions never clobber each other
+    fd, local = tempfile.mkstemp(prefix=f"{day.strftime('%Y%m%d')}_", suffix=f"_{fname}")
+    os.close(fd)
+    try:
+        _download_from_s3(key, local)
+        return open_daily_file(local, bbox=bbox, halo=halo, variables=variables)
+    finally:
+        os.remove(local)
+
+
+def open_daily_file(source, engine=None, bbox=None, halo=0, variables=None):
+    """
+    Open one raw daily NetCDF (path or file-like) and load it into memory
+    with the depth and time dimensions removed.
+
+    bbox = (lat_min, lat_max, lon_min, lon_max) is applied lazily before
+    anything is read, widened by `halo` degrees on every side. With
+    `variables`, only those of them present in the file are decoded.
+    """
+    with _decode_lock, xr.open_dataset(source, engine=engine) as ds:
+
+        if variables is not None:
+            ds = ds[[var for var in variables if var in ds]]
+
+        # Spatial subset before decoding
+        if bbox is not None:
+            lat_min, lat_max, lon_min, lon_max = bbox
+            ds = ds.sel(
+                latitude=slice(lat_min - halo, lat_max + halo),
+                longitude=slice(lon_min - halo, lon_max + halo)
+            )
+
+        # Remove depth
+        if "depth" in ds.dims:
+            ds = ds.isel(depth=0, drop=True)
+        if "depth" in ds.coords:
+            ds = ds.drop_vars("depth")
+
+        # Remove time (we control time dimension)
+        if "time" in ds.dims:
+            ds = ds.isel(time=0, drop=True)
+        if "time" in ds.coords:
+            ds = ds.drop_vars("time")
+
+        return ds.load()
+
+
+# =========================================================
+# DAY ASSEMBLY
+# =========================================================
+def build_day(day, datasets, regrid_method=REGRID_METHOD):
+    """
+    Regrid every file of one day onto the chl grid and merge.
+    `datasets` maps fname -> Dataset returned by open_daily_file;
+    missing files are simply absent. A merged object is used as is.
+    """
+    if MERGED_FILE in datasets:
+        return datasets[MERGED_FILE].expand_dims(time=[np.datetime64(day)])
+
+    tiles = [ds for fname, ds in datasets.items() if parse_tile(fname) is not None]
+    if tiles:
+        ds_day = stitch_tiles(tiles)
+        return None if ds_day is None else ds_day.expand_dims(time=[np.datetime64(day)])
+
+    data_vars = {}
+    master_lat = None
+    master_lon = None
+
+    for fname, variables in FILES.items():
+
+        if fname not in datasets:
+            continue
+
+        try:
+            ds = datasets[fname]
+
+            # Use chlorophyll grid as MASTER grid
+            if "chl" in ds:
+                master_lat = ds.latitude
+                master_lon = ds.longitude
+
+            # Regrid other datasets to chl grid
+            if master_lat is not None and "chl" not in ds:
+                ds = regrid_to(ds, master_lat, master_lon, regrid_method)
+
+            # Extract requested variables
+            for var in variables:
+                if var in ds:
+                    data_vars[var] = ds[var]
+
+        except Exception as e:
+            print(f"⚠️ Could not regrid {fname} for {day}: {e}")
+            continue
+
+    if not data_vars:
+        return None
+
+    # -----------------------------------------------------
+    # Merge variables safely (same grid now)
+    # -----------------------------------------------------
+    ds_day = xr.merge(list(data_vars.values()), join="exact")
+
+    # -----------------------------------------------------
+    # Add daily time dimension
+    # -----------------------------------------------------
+    return ds_day.expand_dims(time=[np.datetime64(day)])
+
+
+# =========================================================
+# CUBE ASSEMBLY
+# =========================================================
+class _CubeAssembler:
+    """
+    Preallocated (time, lat, lon) float32 array per variable, filled one
+    day at a time and wrapped as a Dataset once at the end. Peak memory is
+    the final cube instead of per-day Datasets plus their concatenation.
+    """
+
+    def __init__(self, first_day, features, n_days):
+        self.latitude = first_day.latitude
+        self.longitude = first_day.longitude
+        shape = (n_days, self.latitude.size, self.longitude.size)
+
+        self.arrays = {var: np.full(shape, np.nan, dtype=CUBE_DTYPE) for var in features}
+        self.attrs = {}
+        self.times = []
+
+    @property
+    def size(self):
+        return len(self.times)
+
+    def add(self, day, ds_day):
+        if (ds_day.latitude.size, ds_day.longitude.size) != (self.latitude.size, self.longitude.size):
+            print(f"⚠️ Skipping {day}: grid differs from the first day")
+            return
+
+        row = len(self.times)
+        for var, arr in self.arrays.items():
+            if var in ds_day:
+                arr[row] = ds_day[var].values[0]
+                self.attrs.setdefault(var, ds_day[var].attrs)
+        self.times.append(np.datetime64(day, "ns"))
+
+    def to_dataset(self):
+        n = len(self.times)
+        dims = ("time", "latitude", "longitude")
+        return xr.Dataset(
+            {
+                var: (dims, arr[:n], self.attrs[var])
+                for var, arr in self.arrays.items()
+                if var in self.attrs
+            },
+            coords={
+                "time": np.array(self.times),
+                "latitude": self.latitude,
+                "longitude": self.longitude,
+            }
+        )
+
+
+# =========================================================
+# ZARR CUBE
+# =========================================================
+def _load_from_zarr(start_date, end_date, lat_min, lat_max, lon_min, lon_max, lazy=False):
+    ds = xr.open_zarr(zarr_store(), consolidated=True)
+
+    ds = ds.sel(
+        time=slice(np.datetime64(start_date), np.datetime64(end_date)),
+        latitude=slice(lat_min, lat_max),
+        longitude=slice(lon_min, lon_max)
+    )
+
+    if ds.time.size == 0:
+        raise RuntimeError("❌ No data loaded from Zarr cube")
+
+    if lazy:
+        return ds.chunk({"time": LAZY_TIME_CHUNK})
+
+    # Only the intersecting chunks are read here
+    return ds.load()
+
+
+# =========================================================
+# LAZY (DASK) MODE
+# =========================================================
+class _FlushAfterCompute:
+    """
+    dask callback persisting the object cache index once per compute,
+    instead of once per block fetched (see S3ObjectCache.flush).
+    """
+
+    _registered = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def register(cls):
+        from dask.callbacks import Callback
+
+        with cls._lock:
+            if not cls._registered:
+                Callback(finish=lambda dsk, state, errored: get_cache().flush()).register()
+                cls._registered = True
+
+
+def _feature_files(available, var):
+    """The objects of `available` holding `var`: all of them on a merged or tiled day."""
+    return [fname for fname in available if fname not in FILES or var in FILES[fname]]
+
+
+def _load_feature_block(day, available, var, latitude, longitude, use_cache, in_memory, bbox):
+    """
+    One feature of one day as a (1, lat, lon) float32 block on the
+    latitude/longitude grid; all-NaN when it is missing. Only the objects
+    holding `var` are fetched and only `var` is decoded and regridded.
+    Runs inside dask tasks.
+    """
+    block = np.full((1, latitude.size, longitude.size), np.nan, dtype=CUBE_DTYPE)
+
+    datasets = {}
+    for fname in _feature_files(available, var):
+        try:
+            datasets[fname] = _fetch_file(
+                day, fname, use_cache, in_memory, bbox, available[fname], variables=[var]
+            )
+        except Exception as e:
+            print(f"⚠️ Missing {fname} for {day}: {e}")
+
+    if not datasets:
+        return block
+
+    try:
+        raw = [fname for fname in datasets if fname in FILES]
+        if raw:
+            ds_day = datasets[raw[0]]
+            # Everything but the chl file goes onto the chl grid
+            if "chl" not in FILES[raw[0]]:
+                ds_day = regrid_to(ds_day, latitude, longitude, REGRID_METHOD)
+        else:
+            ds_day = build_day(day, datasets)
+            ds_day = None if ds_day is None else ds_day.isel(time=0)
+    except Exception as e:
+        print(f"⚠️ Could not assemble {var} for {day}: {e}")
+        return block
+
+    if ds_day is None or var not in ds_day:
+        return block
+    if (ds_day.latitude.size, ds_day.longitude.size) != (latitude.size, longitude.size):
+        return block
+
+    block[0] = ds_day[var].values
+    return block
+
+
+def _load_lazy(days, features, manifest, use_cache, in_memory, bbox):
+    """
+    Dask-backed cube with one chunk per (day, feature): selecting a
+    variable or a day only fetches and decodes that variable on that day.
+    Nothing is fetched beyond the first available day (which fixes the
+    grid) until a value is actually computed. Days absent from the
+    manifest are left out; without a manifest, missing days show up as
+    all-NaN time steps.
+    """
+    import dask
+    import dask.array as dsa
+
+    available = {day: _available_files(manifest, day, bbox) for day in days}
+    days = [day for day in days if available[day]]
+
+    probe = None
+    for day in days:
+        try:
+            probe = load_from_s3(
+                day, day, *bbox,
+                use_cache=use_cache, in_memory=in_memory, source="netcdf"
+            )
+            break
+        except RuntimeError:
+            continue
+
+    if probe is None:
+        raise RuntimeError("❌ No data loaded from S3")
+
+    if use_cache and not in_memory:
+        _FlushAfterCompute.register()
+
+    latitude = probe.latitude.values
+    longitude = probe.longitude.values
+    shape = (1, latitude.size, longitude.size)
+
+    def feature(var):
+        return dsa.concatenate([
+            dsa.from_delayed(
+                dask.delayed(_load_feature_block, pure=True)(
+                    day, available[day], var, latitude, longitude, use_cache, in_memory, bbox
+                ),
+                shape=shape,
+                dtype=CUBE_DTYPE
+            )
+            for day in days
+        ])
+
+    dims = ("time", "latitude", "longitude")
+    return xr.Dataset(
+        {
+            var: (dims, feature(var), probe[var].attrs)
+            for var in features
+            if var in probe
+        },
+        coords={
+            "time": np.array([np.datetime64(day, "ns") for day in days]),
+            "latitude": probe.latitude,
+            "longitude": probe.longitude,
+        }
+    )
 
 
 # =========================================================
@@ -27,113 +484,117 @@ def load_from_s3(
     lat_min,
     lat_max,
     lon_min,
-    lon_max
+    lon_max,
+    max_workers=MAX_WORKERS,
+    use_cache=True,
+    in_memory=IN_MEMORY,
+    source=SOURCE,
+    lazy=False
 ):
     """
     Load Copernicus NetCDF data from S3 and return ONE clean Dataset.
 
+    All objects of the window are downloaded and decoded concurrently
+    (at most `max_workers` at a time); days are assembled in date order.
+    Which objects exist is read from the archive manifest (data.manifest);
+    absent objects are skipped without a request, and a day with a merged
+    object (MERGED_FILE) is read with one GET and no regridding. On a
+    tiled archive only the tiles intersecting the bbox are fetched and
+    stitched.
+    With `use_cache`, objects are served from the persistent local cache
+    (see data.s3_cache) and only cache misses hit the network.
+    With `in_memory`, object bodies are decoded straight from memory with
+    the h5netcdf engine and nothing is written to disk (the cache is skipped).
+    With source="zarr", the compacted cube at zarr_store() is read instead and
+    only the chunks intersecting the time range and bbox are fetched.
+
+    Days are written straight into one preallocated float32 array per
+    variable; days without any data are left out of the time axis.
+
+    With `lazy`, a dask-backed Dataset with one chunk per day and variable
+    is returned instead and data is only fetched when something is computed.
+
     Final dataset:
         dims: time, latitude, longitude
         vars: chl, nppv, no3, po4, sst, uo, vo
     """
 
-    tmp_dir = tempfile.gettempdir()
-    daily_datasets = []
-    current = start_date
+    if source == "zarr":
+        return _load_from_zarr(start_date, end_date, lat_min, lat_max, lon_min, lon_max, lazy)
+
+    bbox = (lat_min, lat_max, lon_min, lon_max)
 
+    days = []
+    current = start_date
     while current <= end_date:
+        days.append(current)
+        current += datetime.timedelta(days=1)
 
-        y = current.strftime("%Y")
-        m = current.strftime("%m")
-        d = current.strftime("%d")
-        base = f"{PREFIX}{y}/{m}/{d}/"
-
-        files = {
-            "pft.nc": ["chl", "phyc"],   # ⭐ load TWO vars from same file
-            "nut.nc": ["no3", "po4"],
-            "bio.nc": ["nppv"],
-            "sst.nc": ["sea_surface_temperature_anomaly"],
-            "cur.nc": ["uo", "vo"],
-        }
+    features = [var for variables in FILES.values() for var in variables]
 
+    # Which objects exist (and their ETags) comes from one manifest GET
+    manifest = _read_manifest()
 
-        data_vars = {}
-        master_lat = None
-        master_lon = None
+    if lazy:
+        return _load_lazy(days, features, manifest, use_cache, in_memory, bbox)
+    cube = None
 
-        # -----------------------------------------------------
-        # Download and process each variable
-        # -----------------------------------------------------
-        for fname, variables in files.items():
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
 
-            key = base + fname
-            local = os.path.join(tmp_dir, f"{fname}_{y}{m}{d}.nc")
+        # Keep a bounded number of days in flight so decoded files
+        # never pile up ahead of the assembly
+        remaining = iter(days)
+        pending = deque()
 
-            try:
-                _download_from_s3(key, local)
-                ds = xr.open_dataset(local)
-
-                # Remove depth
-                if "depth" in ds.dims:
-                    ds = ds.isel(depth=0, drop=True)
-                if "depth" in ds.coords:
-                    ds = ds.drop_vars("depth")
-
-                # Remove time (we control time dimension)
-                if "time" in ds.dims:
-                    ds = ds.isel(time=0, drop=True)
-                if "time" in ds.coords:
-                    ds = ds.drop_vars("time")
-
-                # Use chlorophyll grid as MASTER grid
-                if "chl" in ds:
-                    master_lat = ds.latitude
-                    master_lon = ds.longitude
-
-                # Regrid other datasets to chl grid
-                if master_lat is not None and "chl" not in ds:
-                    ds = ds.interp(
-                        latitude=master_lat,
-                        longitude=master_lon,
-                        method="nearest"
+        def submit_next():
+            day = next(remaining, None)
+            if day is not None:
+                available = _available_files(manifest, day, bbox)
+                pending.append((day, {
+                    fname: pool.submit(
+                        _fetch_file, day, fname, use_cache, in_memory, bbox, etag
                     )
+                    for fname, etag in available.items()
+                }))
 
-                # Extract requested variables
-                for var in variables:
-                    if var in ds:
-                        data_vars[var] = ds[var]
+        for _ in range(max_workers):
+            submit_next()
 
+        while pending:
+            day, futures = pending.popleft()
+            submit_next()
+
+            datasets = {}
+            for fname, future in futures.items():
+                try:
+                    datasets[fname] = future.result()
+                except Exception as e:
+                    print(f"⚠️ Missing {fname} for {day}: {e}")
+
+            try:
+                ds_day = build_day(day, datasets)
             except Exception as e:
-                print(f"⚠️ Missing {fname} for {current}: {e}")
+                print(f"⚠️ Could not assemble {day}: {e}")
                 continue
 
-        if not data_vars:
-            current += datetime.timedelta(days=1)
-            continue
-
-        # -----------------------------------------------------
-        # Merge variables safely (same grid now)
-        # -----------------------------------------------------
-        ds_day = xr.merge(list(data_vars.values()), join="exact")
+            if ds_day is None:
+                continue
 
-        # -----------------------------------------------------
-        # Add daily time dimension
-        # -----------------------------------------------------
-        ds_day = ds_day.expand_dims(time=[np.datetime64(current)])
+            if cube is None:
+                cube = _CubeAssembler(ds_day, features, len(days))
+            cube.add(day, ds_day)
 
-        daily_datasets.append(ds_day)
-        current += datetime.timedelta(days=1)
+    if use_cache and not in_memory:
+        get_cache().flush()
 
-    if not daily_datasets:
+    if cube is None or cube.size == 0:
         raise RuntimeError("❌ No data loaded from S3")
 
-    # ---------------------------------------------------------
-    # Concatenate all days
-    # ---------------------------------------------------------
-    ds_all = xr.concat(daily_datasets, dim="time")
+    ds_all = cube.to_dataset()
 
     # ---------------------------------------------------------
-    # Spatial subset
+    # Spatial subset (already applied per file; trims nothing but
+    # keeps the contract explicit)
     # ---------------------------------------------------------
     ds_all = ds_all.sel(
         latitude=slice(lat_min, lat_max),
@@ -1,28 +1,15 @@
-import boto3
-from datetime import date
-
-BUCKET = "hab-bloom-db-2026"
-PREFIX = "daily/"
-
-s3 = boto3.client("s3")
+from data.manifest import load_manifest, rebuild_manifest, last_date
 
 def get_last_available_date():
     """
     Returns latest date available in S3 as datetime.date
-    """
-    resp = s3.list_objects_v2(Bucket=BUCKET, Prefix=PREFIX)
-    if "Contents" not in resp:
-        return None
 
-    dates = set()
-    for obj in resp["Contents"]:
-        parts = obj["Key"].split("/")
-        # daily/YYYY/MM/DD/file.nc
-        if len(parts) >= 4:
-            try:
-                y, m, d = map(int, parts[1:4])
-                dates.add(date(y, m, d))
-            except:
-                pass
+    Read from the archive manifest with a single GET. On an archive without
+    a manifest, the date comes from a paginated listing; nothing is written
+    (only ingestion and maintenance save the manifest).
+    """
+    manifest = load_manifest()
+    if manifest is None:
+        manifest = rebuild_manifest(save=False)
 
-    return max(dates) if dates else None
+    return last_date(manifest)
@@ -0,0 +1,290 @@
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# =========================================================
+# CONFIG
+# =========================================================
+BUCKET = os.getenv("HAB_BUCKET", "hab-bloom-db-2026")
+
+# "s3://<bucket>", "file:///some/dir" (or a plain path), "memory://"
+STORAGE_URL = os.getenv("HAB_STORAGE", f"s3://{BUCKET}")
+
+# One pooled client per process: enough connections for the ingest
+# upload threads × multipart parts in flight and the loader's workers
+MAX_POOL_CONNECTIONS = 32
+
+# Multipart/concurrent uploads: files above the threshold go up in
+# MULTIPART_CHUNK parts, MAX_CONCURRENCY parts at a time
+MULTIPART_THRESHOLD = 8 * 1024 ** 2
+MULTIPART_CHUNK = 8 * 1024 ** 2
+MAX_CONCURRENCY = 4
+
+DELETE_BATCH = 1000     # S3 delete_objects limit per call
+DELETE_WORKERS = 8      # batches in flight
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class NotFound(KeyError):
+    """The requested key does not exist in the storage backend."""
+
+
+def _etag(data):
+    return f'"{hashlib.md5(data).hexdigest()}"'
+
+
+# =========================================================
+# BACKENDS
+# =========================================================
+# Every backend exposes the same methods:
+#   get(key) -> bytes                 put(key, data, content_type=None)
+#   download(key, path) -> etag       upload(path, key)
+#   head(key) -> {"size", "etag"}     list(prefix) -> [{"key", "size", "etag"}]
+#   delete(keys) -> [failed keys]     url(key) -> str
+# Missing keys raise NotFound.
+
+
+class S3Storage:
+    """S3 bucket through one lazily created, pooled boto3 client."""
+
+    def __init__(self, bucket=BUCKET):
+        self.bucket = bucket
+        self._client = None
+        self._transfer = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        # boto3 is imported on first use: importing this module needs no
+        # credentials and costs nothing
+        with self._lock:
+            if self._client is None:
+                import boto3
+                from boto3.s3.transfer import TransferConfig
+                from botocore.config import Config
+
+                self._client = boto3.client(
+                    "s3", config=Config(max_pool_connections=MAX_POOL_CONNECTIONS)
+                )
+                self._transfer = TransferConfig(
+                    multipart_threshold=MULTIPART_THRESHOLD,
+                    multipart_chunksize=MULTIPART_CHUNK,
+                    max_concurrency=MAX_CONCURRENCY,
+                    use_threads=True,
+                )
+            return self._client
+
+    def _call(self, fn, *args, **kwargs):
+        from botocore.exceptions import ClientError
+        try:
+            return fn(*args, **kwargs)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                raise NotFound(kwargs["Key"]) from e
+            raise
+
+    def get(self, key):
+        resp = self._call(self.client.get_object, Bucket=self.bucket, Key=key)
+        return resp["Body"].read()
+
+    def put(self, key, data, content_type=None):
+        extra = {"ContentType": content_type} if content_type else {}
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data, **extra)
+
+    def download(self, key, path):
+        resp = self._call(self.client.get_object, Bucket=self.bucket, Key=key)
+        with open(path, "wb") as f:
+            for chunk in resp["Body"].iter_chunks(CHUNK_SIZE):
+                f.write(chunk)
+        return resp["ETag"]
+
+    def upload(self, path, key):
+        self.client.upload_file(path, self.bucket, key, Config=self._transfer)
+
+    def head(self, key):
+        resp = self._call(self.client.head_object, Bucket=self.bucket, Key=key)
+        return {"size": resp["ContentLength"], "etag": resp["ETag"]}
+
+    def list(self, prefix=""):
+        paginator = self.client.get_paginator("list_objects_v2")
+        return [
+            {"key": obj["Key"], "size": obj["Size"], "etag": obj["ETag"]}
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix)
+            for obj in page.get("Contents", [])
+        ]
+
+    def _delete_batch(self, keys):
+        response = self.client.delete_objects(
+            Bucket=self.bucket,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+        )
+        return response.get("Errors", [])
+
+    def delete(self, keys, workers=DELETE_WORKERS):
+        """delete_objects with DELETE_BATCH keys per call, `workers` calls in flight."""
+        keys = list(keys)
+        batches = [keys[i:i + DELETE_BATCH] for i in range(0, len(keys), DELETE_BATCH)]
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for errors in pool.map(self._delete_batch, batches):
+                for error in errors:
+                    print(f"❌ {error['Key']}: {error.get('Code')} {error.get('Message')}")
+                    failed.append(error["Key"])
+        return failed
+
+    def url(self, key=""):
+        return f"s3://{self.bucket}/{key}"
+
+
+class LocalStorage:
+    """Directory tree on the local filesystem; keys are relative paths."""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def _read(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError as e:
+            raise NotFound(key) from e
+
+    def get(self, key):
+        return self._read(key)
+
+    def put(self, key, data, content_type=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def download(self, key, path):
+        data = self._read(key)
+        with open(path, "wb") as f:
+            f.write(data)
+        return _etag(data)
+
+    def upload(self, path, key):
+        with open(path, "rb") as f:
+            self.put(key, f.read())
+
+    def head(self, key):
+        data = self._read(key)
+        return {"size": len(data), "etag": _etag(data)}
+
+    def list(self, prefix=""):
+        objects = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    objects.append({"key": key, **self.head(key)})
+        return sorted(objects, key=lambda obj: obj["key"])
+
+    def delete(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+        return []
+
+    def url(self, key=""):
+        return self._path(key) if key else self.root
+
+
+class MemoryStorage:
+    """Objects held in a dict, for tests and benchmarks."""
+
+    def __init__(self):
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def _read(self, key):
+        with self._lock:
+            if key not in self.objects:
+                raise NotFound(key)
+            return self.objects[key]
+
+    def get(self, key):
+        return self._read(key)
+
+    def put(self, key, data, content_type=None):
+        with self._lock:
+            self.objects[key] = bytes(data)
+
+    def download(self, key, path):
+        data = self._read(key)
+        with open(path, "wb") as f:
+            f.write(data)
+        return _etag(data)
+
+    def upload(self, path, key):
+        with open(path, "rb") as f:
+            self.put(key, f.read())
+
+    def head(self, key):
+        data = self._read(key)
+        return {"size": len(data), "etag": _etag(data)}
+
+    def list(self, prefix=""):
+        with self._lock:
+            items = sorted(self.objects.items())
+        return [
+            {"key": key, "size": len(data), "etag": _etag(data)}
+            for key, data in items if key.startswith(prefix)
+        ]
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self.objects.pop(key, None)
+        return []
+
+    def url(self, key=""):
+        return f"memory://{key}"
+
+
+# =========================================================
+# CONFIGURED STORAGE
+# =========================================================
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def storage_from_url(url):
+    if url.startswith("s3://"):
+        return S3Storage(url[len("s3://"):].strip("/"))
+    if url.startswith("memory://"):
+        return MemoryStorage()
+    if url.startswith("file://"):
+        url = url[len("file://"):]
+    return LocalStorage(url)
+
+
+def get_storage():
+    """The process-wide storage backend, created once from HAB_STORAGE."""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = storage_from_url(STORAGE_URL)
+        return _storage
+
+
+def set_storage(storage):
+    """Swap the process-wide backend (offline runs, tests, benchmarks)."""
+    global _storage
+    with _storage_lock:
+        _storage = storage
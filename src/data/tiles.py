@@ -0,0 +1,70 @@
+import os
+import re
+import math
+import xarray as xr
+
+# =========================================================
+# CONFIG
+# =========================================================
+# "merged": one merged object per day
+# "tiled": the merged day split into TILE_SIZE° × TILE_SIZE° objects
+ARCHIVE_LAYOUT = os.getenv("HAB_ARCHIVE_LAYOUT", "merged")
+TILE_SIZE = float(os.getenv("HAB_TILE_SIZE", 5))
+
+# daily/YYYY/MM/DD/merged_<lat0>_<lon0>.nc, (lat0, lon0) = south-west corner
+_TILE_RE = re.compile(r"^merged_(-?\d+(?:\.\d+)?)_(-?\d+(?:\.\d+)?)\.nc$")
+
+
+# =========================================================
+# TILE ADDRESSING
+# =========================================================
+def _fmt(value):
+    return f"{value:g}"
+
+
+def tile_fname(lat0, lon0):
+    return f"merged_{_fmt(lat0)}_{_fmt(lon0)}.nc"
+
+
+def parse_tile(fname):
+    """(lat0, lon0) of a tile file name, or None for any other file."""
+    match = _TILE_RE.match(fname)
+    if match is None:
+        return None
+    return float(match.group(1)), float(match.group(2))
+
+
+def tile_origin(value, size=TILE_SIZE):
+    return math.floor(value / size) * size
+
+
+def tile_intersects(fname, bbox, size=TILE_SIZE):
+    """True when the half-open tile [lat0, lat0+size) × [lon0, lon0+size) meets bbox."""
+    lat0, lon0 = parse_tile(fname)
+    lat_min, lat_max, lon_min, lon_max = bbox
+    return lat0 <= lat_max and lat0 + size > lat_min and lon0 <= lon_max and lon0 + size > lon_min
+
+
+# =========================================================
+# SPLIT / STITCH
+# =========================================================
+def split_tiles(ds, size=TILE_SIZE):
+    """{tile_fname: Dataset} covering every grid point of `ds` exactly once."""
+    lat_origin = [tile_origin(v, size) for v in ds.latitude.values]
+    lon_origin = [tile_origin(v, size) for v in ds.longitude.values]
+
+    tiles = {}
+    for lat0 in sorted(set(lat_origin)):
+        lat_idx = [i for i, o in enumerate(lat_origin) if o == lat0]
+        for lon0 in sorted(set(lon_origin)):
+            lon_idx = [i for i, o in enumerate(lon_origin) if o == lon0]
+            tiles[tile_fname(lat0, lon0)] = ds.isel(latitude=lat_idx, longitude=lon_idx)
+    return tiles
+
+
+def stitch_tiles(tiles):
+    """Merge tile Datasets back into one grid; missing tiles are left NaN."""
+    tiles = [t for t in tiles if t.latitude.size and t.longitude.size]
+    if not tiles:
+        return None
+    return xr.merge(tiles, compat="no_conflicts", join="outer", combine_attrs="override")
@@ -1,38 +1,106 @@
-from datetime import date, timedelta
+import os
+import threading
+from datetime import date
 from utils.auth import copernicus_login
-from data.fetch_copernicus import fetch_daily_data
-from data.upload_s3 import upload_to_s3
-from data.s3_utils import get_last_available_date
+from data.ingest_pipeline import publish_merged_day, run_ingestion
+from data.compact_zarr import append_day, merged_day
+from data.fetch_copernicus import DATASETS
+from data.manifest import find_gaps, load_manifest, rebuild_manifest, save_manifest
+from data.ingest_journal import load_journal, reconcile, save_journal
 
 
 LAT_MIN, LAT_MAX = -45, -10
 LON_MIN, LON_MAX = 110, 155
 DEFAULT_START_DATE = date(2026, 1, 1)
 
-def update_database():
-    copernicus_login()
+# Append every ingested day to the chunked Zarr cube as well
+COMPACT_ZARR = os.getenv("HAB_COMPACT_ZARR", "1") == "1"
+
+# Store one pre-merged object per day on the chl grid for the loader
+# (split into lat/lon tiles with HAB_ARCHIVE_LAYOUT=tiled, see data.tiles)
+MERGE_DAILY = os.getenv("HAB_MERGE_DAILY", "1") == "1"
+
+# Backfill with one subset request per dataset over the whole missing range
+BATCH_FETCH = os.getenv("HAB_BATCH_FETCH", "1") == "1"
+
+def update_database(client=None, progress=None):
+    """
+    Backfill the S3 archive up to today.
+
+    `client` replaces copernicusmarine (e.g. data.local_copernicus
+    .LocalCopernicusClient for offline runs); no login happens then.
+    `progress(done, total, day)` is called after every completed day.
+    """
+    if client is None:
+        copernicus_login()
 
     today = date.today()
-    last_date = get_last_available_date()
 
-    start_date = DEFAULT_START_DATE if last_date is None else last_date + timedelta(days=1)
+    manifest = load_manifest() or rebuild_manifest()
+    journal = load_journal()
+    reconcile(journal, manifest)
 
-    if start_date > today:
+    # Every day with a missing unit is redone, not just days after the
+    # latest archived one; the journal narrows each day to its missing units
+    days = [day for day, _ in find_gaps(manifest, DEFAULT_START_DATE, today)]
+
+    if not days:
         return "✅ Database already up-to-date"
 
-    current = start_date
-    while current <= today:
-        print(f"📥 Downloading {current} ...")
+    print(f"📥 Downloading {len(days)} incomplete days in {days[0]} → {days[-1]} ...")
 
-        files = fetch_daily_data(
-            str(current), LAT_MIN, LAT_MAX, LON_MIN, LON_MAX
-        )
+    # Upload threads update both while on_day serializes them
+    state_lock = threading.Lock()
+
+    completed = []
 
-        y, m, d = current.strftime("%Y/%m/%d").split("/")
-        for name, path in files.items():
-            key = f"daily/{y}/{m}/{d}/{name}.nc"
-            upload_to_s3(path, key)
+    def on_day(day, files):
+        with state_lock:
+            save_manifest(manifest)
+            save_journal(journal)
+
+        completed.append(day)
+        if progress is not None:
+            progress(len(completed), len(days), day)
+
+        if not (MERGE_DAILY or COMPACT_ZARR):
+            return
+
+        try:
+            # Units verified in an earlier run are not on local disk
+            ds_day = merged_day(day, files if len(files) == len(DATASETS) else None)
+        except Exception as e:
+            print(f"⚠️ Could not merge {day}: {e}")
+            return
+
+        if MERGE_DAILY:
+            try:
+                publish_merged_day(day, ds_day, manifest=manifest, state_lock=state_lock)
+            except Exception as e:
+                print(f"⚠️ Merged object upload failed for {day}: {e}")
+
+        if COMPACT_ZARR:
+            try:
+                append_day(day, ds_day=ds_day)
+            except Exception as e:
+                print(f"⚠️ Zarr compaction failed for {day}: {e}")
+
+    try:
+        failures = run_ingestion(
+            days,
+            (LAT_MIN, LAT_MAX, LON_MIN, LON_MAX),
+            manifest=manifest,
+            journal=journal,
+            client=client,
+            on_day=on_day,
+            batch=BATCH_FETCH,
+            state_lock=state_lock
+        )
+    finally:
+        save_manifest(manifest)
+        save_journal(journal)
 
-        current += timedelta(days=1)
+    if failures:
+        return f"⚠️ Database updated through {today} with {len(failures)} failed downloads"
 
     return f"✅ Database updated through {today}"
@@ -1,8 +1,10 @@
-import boto3
-
-BUCKET = "hab-bloom-db-2026"
-s3 = boto3.client("s3")
+from data.storage import get_storage
 
 def upload_to_s3(local_path, s3_key):
-    s3.upload_file(local_path, BUCKET, s3_key)
-    print(f"✅ Uploaded: s3://{BUCKET}/{s3_key}")
+    storage = get_storage()
+    storage.upload(local_path, s3_key)
+    print(f"✅ Uploaded: {storage.url(s3_key)}")
+
+def head_s3(s3_key):
+    """Size and ETag of one archived object, to verify an upload."""
+    return get_storage().head(s3_key)
@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+from forecasting.forecast_model import (
+    FEATURES, INPUT_DAYS, MODEL_PATH, PATCH_BATCH, TFLITE_PATH, TILE_SIZE,
+    TFLiteModel, input_windows, load_forecast_model, predict_tiled, preprocess_dataset,
+    to_chlorophyll,
+)
+
+# =========================================================
+# CONFIG
+# =========================================================
+# none:    float32 weights
+# float16: float16 weights, about half the size
+# int8:    dynamic-range quantization, int8 weights with float activations
+#          (no calibration data needed), about a quarter of the size
+QUANTIZE_MODES = ("none", "float16", "int8")
+
+PARITY_SAMPLES = 8          # input windows compared
+PARITY_TOLERANCE = 0.05     # max abs chlorophyll difference allowed (mg/m³)
+
+# =========================================================
+# EXPORT
+# =========================================================
+def export_tflite(output=TFLITE_PATH, quantize="none"):
+    """Convert the Keras model to TFLite. Returns the output path."""
+    import tensorflow as tf
+
+    if quantize not in QUANTIZE_MODES:
+        raise ValueError(f"Unknown quantization: {quantize}")
+
+    model = load_forecast_model("keras")
+
+    # Fully static input: the ConvLSTM loop then lowers to builtin ops only
+    # (tflite_runtime can run it) instead of TensorFlow TensorList kernels.
+    # TFLiteModel pads every call to this shape.
+    spec = tf.TensorSpec([PATCH_BATCH, INPUT_DAYS, TILE_SIZE, TILE_SIZE, len(FEATURES)], tf.float32)
+    fn = tf.function(lambda x: model(x, training=False)).get_concrete_function(spec)
+
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([fn], model)
+    # Builtin ops where possible, TensorFlow kernels for anything else
+    converter.target_spec.supported_ops = [
+        tf.lite.OpsSet.TFLITE_BUILTINS,
+        tf.lite.OpsSet.SELECT_TF_OPS,
+    ]
+    if quantize != "none":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantize == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+
+    with open(output, "wb") as f:
+        f.write(converter.convert())
+
+    print(f"✅ Exported {output} ({quantize}): "
+          f"{os.path.getsize(MODEL_PATH) / 1e6:.1f} MB -> {os.path.getsize(output) / 1e6:.1f} MB")
+    return output
+
+
+# =========================================================
+# ACCURACY PARITY
+# =========================================================
+def parity_inputs(netcdf=None, samples=PARITY_SAMPLES, seed=0):
+    """
+    (samples, INPUT_DAYS, H, W, F) model inputs: real 4-day windows over the
+    whole grid of a NetCDF file when given, else standard-normal TILE_SIZE
+    patches (what normalized inputs look like).
+    """
+    if netcdf:
+        import xarray as xr
+        with xr.open_dataset(netcdf) as ds:
+            data = preprocess_dataset(ds)
+        return np.ascontiguousarray(input_windows(data)[:samples])
+
+    rng = np.random.default_rng(seed)
+    shape = (samples, INPUT_DAYS, TILE_SIZE, TILE_SIZE, len(FEATURES))
+    return rng.standard_normal(shape, dtype=np.float32)
+
+
+def _timed_predict(model, inputs):
+    predict_tiled(model, inputs[:1])     # warm-up
+    t0 = time.perf_counter()
+    prediction = predict_tiled(model, inputs)
+    return prediction, (time.perf_counter() - t0) / len(inputs)
+
+
+def check_parity(path=TFLITE_PATH, inputs=None, tolerance=PARITY_TOLERANCE):
+    """
+    Run the Keras model and the exported one on the same inputs and compare
+    the forecasts in chlorophyll units. Both go through predict_tiled, as in
+    generate_forecast, so windows of any grid size fit the exported tile
+    shape. Returns True within tolerance.
+    """
+    if inputs is None:
+        inputs = parity_inputs()
+
+    t0 = time.perf_counter()
+    exported = TFLiteModel(path)
+    load_seconds = time.perf_counter() - t0
+
+    reference, keras_seconds = _timed_predict(load_forecast_model("keras"), inputs)
+    candidate, tflite_seconds = _timed_predict(exported, inputs)
+
+    err = np.abs(to_chlorophyll(candidate) - to_chlorophyll(reference))
+    ok = bool(err.max() <= tolerance)
+
+    print(f"{'✅' if ok else '❌'} {os.path.basename(path)} vs Keras on {len(inputs)} windows: "
+          f"max abs error {err.max():.4f}, mean {err.mean():.5f} mg/m³ (tolerance {tolerance})")
+    print(f"   TFLite load {load_seconds:.2f} s, "
+          f"per window {tflite_seconds * 1e3:.1f} ms vs Keras {keras_seconds * 1e3:.1f} ms")
+    return ok
+
+
+# =========================================================
+# CLI
+#   python -m forecasting.export_model export [--quantize float16] [--output PATH]
+#   python -m forecasting.export_model parity [--model PATH] [--netcdf FILE]
+# =========================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m forecasting.export_model")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("export", help="convert the Keras model to TFLite")
+    p.add_argument("--quantize", choices=QUANTIZE_MODES, default="none")
+    p.add_argument("--output", default=TFLITE_PATH)
+    p.add_argument("--no-check", action="store_true", help="skip the parity check")
+
+    p = commands.add_parser("parity", help="compare an exported model with the Keras one")
+    p.add_argument("--model", default=TFLITE_PATH)
+    p.add_argument("--netcdf", help="take input windows from this file instead of random data")
+    p.add_argument("--samples", type=int, default=PARITY_SAMPLES)
+    p.add_argument("--tolerance", type=float, default=PARITY_TOLERANCE)
+
+    args = parser.parse_args(sys.argv[1:])
+
+    if args.command == "export":
+        path = export_tflite(args.output, args.quantize)
+        if not args.no_check and not check_parity(path):
+            raise SystemExit(1)
+
+    elif args.command == "parity":
+        inputs = parity_inputs(args.netcdf, args.samples)
+        if not check_parity(args.model, inputs, args.tolerance):
+            raise SystemExit(1)
@@ -0,0 +1,189 @@
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from forecasting.forecast_model import (
+    FEATURES, FORECAST_BACKEND, INPUT_DAYS, MODEL_PATH, TFLITE_PATH, TILE_OVERLAP, TILE_SIZE,
+    generate_forecast,
+)
+
+# =========================================================
+# CONFIG
+# =========================================================
+FORECAST_CACHE_ENTRIES = int(os.getenv("HAB_FORECAST_CACHE_ENTRIES", "32"))
+
+# Directory to persist forecasts in (shared by every process pointing at
+# it); empty keeps them in memory only
+FORECAST_CACHE_DIR = os.getenv("HAB_FORECAST_CACHE_DIR", "")
+
+# Part of every key: bump when forecast post-processing changes so
+# persisted maps from older code are not served
+CACHE_FORMAT = 2
+
+# =========================================================
+# CACHE KEY
+# =========================================================
+_model_digests = {}
+_digest_lock = threading.Lock()
+
+
+def model_version(backend=FORECAST_BACKEND):
+    """
+    Fingerprint of the model a backend would load, plus the tiling settings
+    that shape its output. The file hash is recomputed only when the file
+    changes.
+    """
+    path = TFLITE_PATH if backend == "tflite" else MODEL_PATH
+    stat = os.stat(path)
+
+    with _digest_lock:
+        cached = _model_digests.get(path)
+        if cached is None or cached[0] != (stat.st_size, stat.st_mtime_ns):
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            cached = (stat.st_size, stat.st_mtime_ns), digest.hexdigest()
+            _model_digests[path] = cached
+
+    return f"{backend}:{cached[1]}:{TILE_SIZE}:{TILE_OVERLAP}:{CACHE_FORMAT}"
+
+
+def forecast_key(ds, version):
+    """sha256 over the 4-day input window, its bbox/grid and the model version."""
+    window = ds.isel(time=slice(-INPUT_DAYS, None))
+    lat = window.latitude.values
+    lon = window.longitude.values
+
+    digest = hashlib.sha256()
+    digest.update(version.encode())
+    digest.update(repr((
+        float(lat.min()), float(lat.max()), float(lon.min()), float(lon.max()),
+        lat.size, lon.size,
+    )).encode())
+    digest.update(np.ascontiguousarray(window.time.values).tobytes())
+
+    for var in FEATURES:
+        arr = np.ascontiguousarray(window[var].values)
+        digest.update(f"{var}{arr.dtype}{arr.shape}".encode())
+        digest.update(arr.tobytes())
+
+    return digest.hexdigest()
+
+
+# =========================================================
+# FORECAST CACHE
+# =========================================================
+class ForecastCache:
+    """
+    LRU cache of (day1, day2) forecast maps keyed by forecast_key.
+
+    Up to `max_entries` forecasts are held in memory; with a `cache_dir`
+    every forecast is also written there as <key>.npz (atomic temp file +
+    os.replace), so it survives restarts and is shared between processes.
+    Disk entries are not evicted: they are small and keyed by content.
+    """
+
+    def __init__(self, max_entries=FORECAST_CACHE_ENTRIES, cache_dir=FORECAST_CACHE_DIR):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir or None
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _remember(self, key, maps):
+        for arr in maps:
+            # Shared between sessions: nobody may modify a cached map
+            arr.setflags(write=False)
+        with self._lock:
+            self._entries[key] = maps
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """(day1, day2) for a key, or None."""
+        with self._lock:
+            maps = self._entries.get(key)
+            if maps is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return maps
+
+        if self.cache_dir:
+            try:
+                with np.load(self._path(key)) as f:
+                    maps = (f["day1"], f["day2"])
+            except (OSError, KeyError, ValueError):
+                maps = None
+            if maps is not None:
+                self._remember(key, maps)
+                with self._lock:
+                    self.hits += 1
+                return maps
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, day1, day2):
+        maps = (np.asarray(day1), np.asarray(day2))
+        self._remember(key, maps)
+
+        if self.cache_dir:
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, day1=maps[0], day2=maps[1])
+                os.replace(tmp, self._path(key))
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+        return maps
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+# One cache per process, shared by every Streamlit session
+forecast_cache = ForecastCache()
+
+
+def cached_forecast(ds, backend=FORECAST_BACKEND, cache=None):
+    """
+    generate_forecast(ds) through the forecast cache: the model only runs
+    when this 4-day window, grid and model version have not been seen.
+    Returned maps are read-only.
+    """
+    if cache is None:
+        cache = forecast_cache
+
+    # Read once (one compute for a lazy dataset), then hashed and forecast
+    window = ds.isel(time=slice(-INPUT_DAYS, None)).load()
+    key = forecast_key(window, model_version(backend))
+
+    maps = cache.get(key)
+    if maps is None:
+        maps = cache.put(key, *generate_forecast(window, backend))
+    return maps
@@ -4,10 +4,11 @@
 
 import os
 import numpy as np
-import tensorflow as tf
 import json
-from tensorflow.keras import layers
-from tensorflow.keras.utils import register_keras_serializable
+import threading
+
+# TensorFlow is imported on the first forecast, not with this module:
+# it dominates the dashboard's cold start otherwise
 
 # =========================================================
 # PATH HANDLING (Docker-safe)
@@ -15,14 +16,21 @@ from tensorflow.keras.utils import register_keras_serializable
 
 BASE_DIR = os.path.dirname(__file__)
 MODEL_PATH = os.path.join(BASE_DIR, "best_convlstm_model.keras")
+TFLITE_PATH = os.path.join(BASE_DIR, "best_convlstm_model.tflite")
 STATS_PATH = os.path.join(BASE_DIR, "normalization_stats.json")
 
 # =========================================================
-# LOAD NORMALIZATION STATS
+# LOAD NORMALIZATION STATS (Cached)
 # =========================================================
 
-with open(STATS_PATH, "r") as f:
-    stats = json.load(f)
+_stats = None
+
+def load_stats():
+    global _stats
+    if _stats is None:
+        with open(STATS_PATH, "r") as f:
+            _stats = json.load(f)
+    return _stats
 
 FEATURES = [
     "chl", "phyc", "nppv", "no3", "po4",
@@ -31,129 +39,378 @@ FEATURES = [
 
 LOG_VARS = ["chl", "phyc", "nppv", "no3", "po4"]
 
+INPUT_DAYS = 4      # days of input per forecast
+LEAD_DAYS = 2       # days forecast ahead
+
+# Tiled inference: the grid goes through the model in TILE_SIZE × TILE_SIZE
+# patches overlapping by TILE_OVERLAP cells, PATCH_BATCH patches per call
+TILE_SIZE = int(os.getenv("HAB_FORECAST_TILE", "64"))
+TILE_OVERLAP = int(os.getenv("HAB_FORECAST_OVERLAP", "16"))
+PATCH_BATCH = int(os.getenv("HAB_PATCH_BATCH", "8"))
+
+# Patches per predict call in generate_hindcast
+HINDCAST_BATCH = int(os.getenv("HAB_HINDCAST_BATCH", "16"))
+
 # =========================================================
 # CUSTOM LAYERS (Required for Model Loading)
 # =========================================================
 
-@register_keras_serializable()
-class SpatialAttention(layers.Layer):
-    def build(self, input_shape):
-        self.conv = layers.Conv3D(
-            filters=1,
-            kernel_size=(1, 3, 3),
-            padding="same",
-            activation="sigmoid"
-        )
-        super().build(input_shape)
-
-    def call(self, x):
-        attention = self.conv(x)
-        return x * attention
+_custom_objects = None
 
-
-@register_keras_serializable()
-def masked_mse(y_true, y_pred):
-    return tf.reduce_mean((y_true - y_pred) ** 2)
+def custom_objects():
+    """
+    SpatialAttention and masked_mse, defined (and registered with Keras)
+    on first use together with the TensorFlow import.
+    """
+    global _custom_objects
+    if _custom_objects is not None:
+        return _custom_objects
+
+    import tensorflow as tf
+    from tensorflow.keras import layers
+    from tensorflow.keras.utils import register_keras_serializable
+
+    @register_keras_serializable()
+    class SpatialAttention(layers.Layer):
+        def build(self, input_shape):
+            self.conv = layers.Conv3D(
+                filters=1,
+                kernel_size=(1, 3, 3),
+                padding="same",
+                activation="sigmoid"
+            )
+            super().build(input_shape)
+
+        def call(self, x):
+            attention = self.conv(x)
+            return x * attention
+
+    @register_keras_serializable()
+    def masked_mse(y_true, y_pred):
+        return tf.reduce_mean((y_true - y_pred) ** 2)
+
+    _custom_objects = {
+        "SpatialAttention": SpatialAttention,
+        "masked_mse": masked_mse
+    }
+    return _custom_objects
 
 
 # =========================================================
 # LOAD MODEL (Cached)
 # =========================================================
 
-_model = None
+# "keras": the full model; "tflite": the lightweight CPU export written by
+# python -m forecasting.export_model export
+FORECAST_BACKEND = os.getenv("HAB_FORECAST_BACKEND", "keras")
+
+_models = {}
+
+def load_forecast_model(backend=FORECAST_BACKEND):
+    if backend not in _models:
+        if backend == "keras":
+            import tensorflow as tf
+
+            _models[backend] = tf.keras.models.load_model(
+                MODEL_PATH,
+                custom_objects=custom_objects()
+            )
+        elif backend == "tflite":
+            _models[backend] = TFLiteModel(TFLITE_PATH)
+        else:
+            raise ValueError(f"Unknown forecast backend: {backend}")
+    return _models[backend]
+
+
+class TFLiteModel:
+    """
+    An exported .tflite model behind the same predict() as the Keras one.
+    Runs on the standalone tflite_runtime interpreter when it is installed
+    (no TensorFlow import at all), else on TensorFlow's.
+
+    The export has a fixed (PATCH_BATCH, INPUT_DAYS, TILE_SIZE, TILE_SIZE, F)
+    input: inputs are split into batches of that size, and short batches or
+    grids smaller than a tile are zero-padded, then cropped from the output
+    (on such small grids the outermost cells differ slightly from Keras).
+    """
 
-def load_forecast_model():
-    global _model
-    if _model is None:
-        _model =tf.keras.models.load_model(
-            MODEL_PATH,
-            custom_objects={
-                "SpatialAttention": SpatialAttention,
-                "masked_mse": masked_mse
-            }
-        )
-    return _model
+    def __init__(self, path=TFLITE_PATH):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        self.interpreter = Interpreter(model_path=path, num_threads=os.cpu_count())
+        self.interpreter.allocate_tensors()
+        details = self.interpreter.get_input_details()[0]
+        self._input = details["index"]
+        self._output = self.interpreter.get_output_details()[0]["index"]
+        self.batch, _, self.height, self.width, _ = details["shape"]
+        # One interpreter per process; it is not thread-safe
+        self._lock = threading.Lock()
+
+    def predict(self, x, batch_size=None, verbose=0):
+        n, _, h, w, _ = x.shape
+        if h > self.height or w > self.width:
+            raise ValueError(
+                f"{h}x{w} patches do not fit the exported {self.height}x{self.width} model; "
+                "export it with the same HAB_FORECAST_TILE used for inference."
+            )
+
+        outputs = []
+        for start in range(0, n, self.batch):
+            chunk = x[start:start + self.batch].astype(np.float32, copy=False)
+            size = len(chunk)
+            chunk = np.pad(
+                chunk,
+                ((0, self.batch - size), (0, 0), (0, self.height - h), (0, self.width - w), (0, 0)),
+                mode="constant",
+            )
+            with self._lock:
+                self.interpreter.set_tensor(self._input, chunk)
+                self.interpreter.invoke()
+                outputs.append(self.interpreter.get_tensor(self._output)[:size, :, :h, :w].copy())
+        return np.concatenate(outputs)
 
 
 # =========================================================
 # PREPROCESS STREAMLIT DATASET
 # =========================================================
 
-def preprocess_dataset(ds):
+_feature_stats = None
+
+def feature_stats():
+    """
+    (mean, 1 / (std + 1e-8), log mask) as float32 arrays over FEATURES,
+    built once from normalization_stats.json
+    """
+    global _feature_stats
+    if _feature_stats is None:
+        stats = load_stats()
+        mean = np.array([stats[var]["mean"] for var in FEATURES], dtype=np.float32)
+        scale = np.array([1.0 / (stats[var]["std"] + 1e-8) for var in FEATURES], dtype=np.float32)
+        log_mask = np.array([var in LOG_VARS for var in FEATURES])
+        _feature_stats = mean, scale, log_mask
+    return _feature_stats
+
+
+def preprocess_dataset(ds, out=None):
     """
     Must exactly match 02_preprocess_normalize.py
+
+    (T, H, W, F) float32 model input for every day in ds, written into `out`
+    when given (e.g. a slice of a preallocated batch). Slice ds to the days
+    needed first: only those are read.
     """
 
-    data_list = []
+    mean, scale, log_mask = feature_stats()
 
     for var in FEATURES:
-
         if var not in ds:
             raise ValueError(f"{var} missing from dataset")
 
+    for i, var in enumerate(FEATURES):
+
         arr = ds[var]
 
         # Remove depth dimension if exists
         if "depth" in arr.dims:
             arr = arr.isel(depth=0)
 
-        # Remove time dimension if single day object
-        arr = arr.values
-
-        # 1️⃣ LOG TRANSFORM (same as training)
-        if var in LOG_VARS:
-            arr = np.log1p(arr)
-
-        # 2️⃣ FILL NaNs with 0 (CRITICAL — you missed this)
-        arr = np.nan_to_num(arr, nan=0.0)
-
-        # 3️⃣ NORMALIZE using saved stats
-        mean = stats[var]["mean"]
-        std = stats[var]["std"]
+        if out is None:
+            out = np.empty(arr.shape + (len(FEATURES),), dtype=np.float32)
 
-        arr = (arr - mean) / (std + 1e-8)
+        out[..., i] = arr.values
 
-        data_list.append(arr)
+    # Same steps as training, in place over all features at once:
+    # 1️⃣ LOG TRANSFORM  2️⃣ FILL NaNs with 0  3️⃣ NORMALIZE using saved stats
+    np.log1p(out, out=out, where=log_mask)
+    np.nan_to_num(out, copy=False, nan=0.0)
+    out -= mean
+    out *= scale
 
-    data = np.stack(data_list, axis=-1)
-
-    return data
+    return out
 
 # =========================================================
 # GENERATE FORECAST
 # =========================================================
 
-def generate_forecast(ds):
+def generate_forecast(ds, backend=FORECAST_BACKEND):
     """
     Generate 2-day chlorophyll forecast
     Requires at least 4 days in ds
+    backend: "keras" or "tflite" (see load_forecast_model)
     Returns:
         day1_map (H,W)
         day2_map (H,W)
     """
 
-    if ds.time.size < 4:
-        raise ValueError("At least 4 days required for forecasting.")
+    if ds.time.size < INPUT_DAYS:
+        raise ValueError(f"At least {INPUT_DAYS} days required for forecasting.")
 
-    model = load_forecast_model()
+    model = load_forecast_model(backend)
 
-    data = preprocess_dataset(ds)
+    # Only the last 4 days are read, straight into the model's input batch.
+    # One load for a lazy (dask) dataset: a single compute for the whole
+    # window instead of one per variable
+    window = ds.isel(time=slice(-INPUT_DAYS, None)).load()
+    input_seq = np.empty(
+        (1, INPUT_DAYS, ds.latitude.size, ds.longitude.size, len(FEATURES)), dtype=np.float32
+    )
+    preprocess_dataset(window, out=input_seq[0])
+
+    prediction = predict_tiled(model, input_seq)[0]
 
-    # Use last 4 days
-    input_seq = data[-4:]
-    input_seq = np.expand_dims(input_seq, axis=0)
+    day1, day2 = to_chlorophyll(prediction)
 
-    prediction = model.predict(input_seq, verbose=0)[0]
+    return day1, day2
 
-    # Convert back to original chlorophyll scale
+
+def to_chlorophyll(prediction):
+    """
+    (..., LEAD_DAYS, H, W, 1) model output -> (..., LEAD_DAYS, H, W)
+    chlorophyll on the original scale
+    """
+    stats = load_stats()
     chl_mean = stats["chl"]["mean"]
     chl_std = stats["chl"]["std"]
 
-    day1 = prediction[0, :, :, 0] * chl_std + chl_mean
-    day2 = prediction[1, :, :, 0] * chl_std + chl_mean
+    # The model works on normalized log1p(chl) (see preprocess_dataset)
+    chl = np.expm1(prediction[..., 0] * chl_std + chl_mean)
 
     # Physical constraint (chlorophyll cannot be negative)
-    day1 = np.clip(day1, 0, None)
-    day2 = np.clip(day2, 0, None)
+    return np.clip(chl, 0, None)
+
+# =========================================================
+# TILED INFERENCE
+# =========================================================
+
+def tile_starts(size, tile=TILE_SIZE, overlap=TILE_OVERLAP):
+    """Patch offsets covering 0..size, the last one flush with the edge."""
+    if size <= tile:
+        return [0]
+    step = max(tile - overlap, 1)
+    starts = list(range(0, size - tile, step))
+    return starts + [size - tile]
+
+
+def blend_weights(tile, overlap=TILE_OVERLAP):
+    """
+    1-D patch weight: 1 in the interior, ramping down linearly across the
+    overlap at each end, so seams fade from one patch into the next.
+    """
+    ramp = np.arange(1, overlap + 1, dtype=np.float32) / (overlap + 1)
+    weights = np.ones(tile, dtype=np.float32)
+    n = min(overlap, tile // 2)
+    weights[:n] = ramp[:n]
+    weights[tile - n:] = ramp[:n][::-1]
+    return weights
+
+
+def predict_tiled(model, inputs, tile=TILE_SIZE, overlap=TILE_OVERLAP, batch_size=PATCH_BATCH):
+    """
+    model.predict over (N, INPUT_DAYS, H, W, F) inputs of any size.
+
+    Every input is cut into overlapping tile × tile patches, batch_size
+    patches go through the model per call and the outputs are blended back
+    with blend_weights. Only one batch of patches is copied out of `inputs`
+    (which may be a strided view), so memory is bounded by the batch and
+    the (N, LEAD_DAYS, H, W, 1) output, whatever the region size.
+    """
+    n, _, h, w, _ = inputs.shape
+    ys = tile_starts(h, tile, overlap)
+    xs = tile_starts(w, tile, overlap)
+    th, tw = min(tile, h), min(tile, w)
+
+    weight = np.outer(blend_weights(th, overlap), blend_weights(tw, overlap))[..., None]
+    output = np.zeros((n, LEAD_DAYS, h, w, 1), dtype=np.float32)
+    total = np.zeros((h, w, 1), dtype=np.float32)
+    for y in ys:
+        for x in xs:
+            total[y:y + th, x:x + tw] += weight
+
+    patches = [(i, y, x) for i in range(n) for y in ys for x in xs]
+    for start in range(0, len(patches), batch_size):
+        chunk = patches[start:start + batch_size]
+        batch = np.stack([inputs[i, :, y:y + th, x:x + tw] for i, y, x in chunk])
+        prediction = model.predict(batch, batch_size=batch_size, verbose=0)
+        for (i, y, x), patch in zip(chunk, prediction):
+            output[i, :, y:y + th, x:x + tw] += patch * weight
+
+    return output / total
+
+# =========================================================
+# HINDCAST
+# =========================================================
+
+def input_windows(data, stride=1):
+    """
+    Every INPUT_DAYS window of a preprocessed (T, H, W, F) cube as a
+    (N, INPUT_DAYS, H, W, F) strided view, one window every `stride` days.
+    No data is copied.
+    """
+    windows = np.lib.stride_tricks.sliding_window_view(data, INPUT_DAYS, axis=0)
+    # (N, H, W, F, INPUT_DAYS) -> (N, INPUT_DAYS, H, W, F)
+    return np.moveaxis(windows, -1, 1)[::stride]
+
 
-    return day1, day2
\ No newline at end of file
+def generate_hindcast(ds, batch_size=HINDCAST_BATCH, stride=1, model=None, backend=FORECAST_BACKEND):
+    """
+    Forecast from every 4-day window in ds, batch_size patches per predict
+    call, and score each lead against the observed chlorophyll.
+
+    Returns an xarray Dataset with
+        forecast (init_time, lead, latitude, longitude)
+            init_time is the last input day, lead is in days
+        rmse, mae, bias, n_valid (lead)
+            over every forecast whose valid day is in ds and observed
+    """
+    import xarray as xr
+
+    if ds.time.size < INPUT_DAYS:
+        raise ValueError(f"At least {INPUT_DAYS} days required for forecasting.")
+
+    if model is None:
+        model = load_forecast_model(backend)
+
+    # A lazy dataset is computed once, not once per variable (see generate_forecast)
+    ds = ds.compute()
+
+    data = preprocess_dataset(ds)
+    windows = input_windows(data, stride)
+
+    forecast = to_chlorophyll(predict_tiled(model, windows, batch_size=batch_size))
+
+    init_idx = np.arange(INPUT_DAYS - 1, ds.time.size)[::stride]
+    leads = np.arange(1, LEAD_DAYS + 1)
+
+    observed = ds["chl"]
+    if "depth" in observed.dims:
+        observed = observed.isel(depth=0)
+    observed = observed.values
+
+    scores = {"rmse": [], "mae": [], "bias": [], "n_valid": []}
+    for k, lead in enumerate(leads):
+        # Windows whose valid day (init + lead) falls inside ds
+        has_obs = init_idx + lead < ds.time.size
+        err = forecast[has_obs, k] - observed[init_idx[has_obs] + lead]
+        err = err[np.isfinite(err)]
+
+        scores["n_valid"].append(err.size)
+        scores["rmse"].append(np.sqrt(np.mean(err ** 2)) if err.size else np.nan)
+        scores["mae"].append(np.mean(np.abs(err)) if err.size else np.nan)
+        scores["bias"].append(np.mean(err) if err.size else np.nan)
+
+    return xr.Dataset(
+        {
+            "forecast": (("init_time", "lead", "latitude", "longitude"), forecast),
+            **{name: ("lead", np.asarray(values)) for name, values in scores.items()},
+        },
+        coords={
+            "init_time": ds.time.values[init_idx],
+            "lead": leads,
+            "latitude": ds.latitude.values,
+            "longitude": ds.longitude.values,
+        },
+    )
\ No newline at end of file
@@ -21,10 +21,12 @@ for env in ["CARTOPY_DATA_DIR","CARTOPY_USER_BACKGROUNDS","MPLCONFIGDIR","STREAM
 import streamlit as st
 import datetime
 import numpy as np
-from forecasting.forecast_model import generate_forecast
+from forecasting.forecast_cache import cached_forecast, forecast_cache
+from forecasting.forecast_model import INPUT_DAYS
 from visualization.visualizer import plot_forecast_map
-from data.update_database import update_database
-from data.s3_loader import load_from_s3
+from data.ingest_worker import DONE, FAILED, ensure_worker, job_status, submit_job
+from data.s3_cache import get_cache
+from data.dataset_manager import SessionDataset
 from data.detection import detect_bloom
 
 from visualization.visualizer import (
@@ -50,10 +52,36 @@ st.markdown(
 # =========================================================
 st.sidebar.header("🗄 Database Control")
 
+# Ingestion runs in a background worker (data.ingest_worker); clicks from
+# several sessions all attach to the same queued/running job
 if st.sidebar.button("🔄 Update Database"):
-    with st.spinner("Updating S3 database (Copernicus → S3)…"):
-        msg = update_database()
-    st.success(msg)
+    submit_job()
+    ensure_worker()
+
+
+@st.fragment(run_every="5s")
+def ingestion_status():
+    job = job_status()
+    if job is None:
+        return
+
+    if job["state"] == DONE:
+        st.success(job["message"])
+    elif job["state"] == FAILED:
+        st.error(job["message"])
+    else:
+        progress = job["progress"]
+        if progress:
+            st.progress(
+                progress["done"] / progress["total"],
+                text=f"Copernicus → S3: {progress['done']}/{progress['total']} days ({progress['day']})"
+            )
+        else:
+            st.info(f"Database update {job['state']}…")
+
+
+with st.sidebar:
+    ingestion_status()
 
 st.sidebar.header("🧭 Analysis Settings")
 
@@ -69,6 +97,10 @@ lon_min = st.sidebar.number_input("Min Longitude", 0.0, 360.0, 110.0)
 lon_max = st.sidebar.number_input("Max Longitude", 0.0, 360.0, 155.0)
 
 threshold = st.sidebar.slider("Bloom Threshold (mg/m³)", 0.5, 10.0, 2.0, 0.1)
+lazy = st.sidebar.checkbox(
+    "Lazy loading (long date ranges)", False,
+    help="Keep the data out of core and only compute what each chart needs."
+)
 run = st.sidebar.button("🚀 Run Analysis")
 
 # =========================================================
@@ -79,8 +111,14 @@ if run:
         st.error("❌ Start date must be before end date.")
         st.stop()
 
+    # Reuses the days/bbox this session already holds
+    if "dataset_manager" not in st.session_state:
+        st.session_state["dataset_manager"] = SessionDataset()
+
     with st.spinner("📥 Loading data from S3 database…"):
-        ds = load_from_s3(start_date, end_date, lat_min, lat_max, lon_min, lon_max)
+        ds = st.session_state["dataset_manager"].get(
+            start_date, end_date, lat_min, lat_max, lon_min, lon_max, lazy=lazy
+        )
 
     st.session_state["dataset"] = ds
 
@@ -93,6 +131,13 @@ if "dataset" not in st.session_state:
 
 ds = st.session_state["dataset"]
 
+# The object cache exists once data has been loaded
+cache_stats = get_cache().stats()
+st.sidebar.caption(
+    f"S3 cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+    f"({cache_stats['bytes'] / 1024**2:.0f} MB)"
+)
+
 # =========================================================
 # BLOOM DETECTION
 # =========================================================
@@ -251,12 +296,20 @@ with tab4:
 
     st.subheader("🔮 2-Day Chlorophyll Forecast")
 
-    if ds.time.size < 4:
-        st.warning("At least 4 days required for forecasting.")
+    if ds.time.size < INPUT_DAYS:
+        st.warning(f"At least {INPUT_DAYS} days required for forecasting.")
     else:
 
+        # Reruns (any widget change) and other sessions on the same window
+        # are served from the forecast cache instead of re-running the model
         with st.spinner("Generating forecast..."):
-            day1, day2 = generate_forecast(ds)
+            day1, day2 = cached_forecast(ds.isel(time=slice(-INPUT_DAYS, None)))
+
+        forecast_stats = forecast_cache.stats()
+        st.caption(
+            f"Forecast cache: {forecast_stats['hits']} hits / {forecast_stats['misses']} misses "
+            f"({forecast_stats['entries']}/{forecast_stats['max_entries']} in memory)"
+        )
 
         lat = ds.latitude.values
         lon = ds.longitude.values
@@ -1,5 +1,4 @@
 import os
-import copernicusmarine
 
 def copernicus_login():
     """
@@ -14,6 +13,8 @@ def copernicus_login():
             "Copernicus credentials not found in environment variables."
         )
 
+    import copernicusmarine
+
     # ✅ Compatible with all released versions
     copernicusmarine.login(
         username=user,
@@ -1,10 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
+import xarray as xr
 import matplotlib.dates as mdates
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
 
 # =========================================================
 # Helper utilities
@@ -18,6 +15,55 @@ def _flatten_valid(*arrays):
 def _current_speed(ds):
     return np.sqrt(ds.uo**2 + ds.vo**2)
 
+# Scatter plots never draw more points than this (strided subsample)
+MAX_SCATTER_POINTS = 200_000
+
+def _spatial_means(ds, names):
+    """Area-mean time series of several variables in ONE pass (dask-safe)."""
+    return ds[names].mean(dim=["latitude","longitude"]).compute()
+
+def _subsample(ds, max_points=MAX_SCATTER_POINTS):
+    """Stride lat/lon so at most `max_points` values get materialized."""
+    stride = int(np.ceil(np.sqrt(ds.chl.size / max_points)))
+    if stride <= 1:
+        return ds
+    return ds.isel(
+        latitude=slice(None, None, stride),
+        longitude=slice(None, None, stride)
+    )
+
+def _masked_corr(columns):
+    """
+    Pearson correlation over the points where every column is finite
+    (same result as DataFrame.dropna().corr()), computed with reductions
+    only so dask-backed inputs never get materialized.
+    """
+    import pandas as pd
+
+    names = list(columns)
+    valid = None
+    for da in columns.values():
+        ok = np.isfinite(da)
+        valid = ok if valid is None else valid & ok
+
+    masked = {k: da.where(valid) for k, da in columns.items()}
+    means = {k: v.mean() for k, v in masked.items()}
+    means = dict(zip(names, xr.Dataset(means).compute().to_array().values))
+
+    centered = {k: masked[k] - means[k] for k in names}
+    moments = {}
+    for i, a in enumerate(names):
+        for b in names[i:]:
+            moments[f"{a}|{b}"] = (centered[a] * centered[b]).sum()
+    moments = xr.Dataset(moments).compute()
+
+    corr = pd.DataFrame(np.eye(len(names)), index=names, columns=names)
+    for i, a in enumerate(names):
+        for b in names[i + 1:]:
+            denom = np.sqrt(float(moments[f"{a}|{a}"]) * float(moments[f"{b}|{b}"]))
+            corr.loc[a, b] = corr.loc[b, a] = float(moments[f"{a}|{b}"]) / denom
+    return corr
+
 def _format_dates(ax):
     """Fix crowded date axis"""
     ax.xaxis.set_major_locator(mdates.AutoDateLocator(maxticks=6))
@@ -31,14 +77,23 @@ def _format_dates(ax):
 # =========================================================
 def compute_kpis(ds, bloom_mask):
 
-    # --- Raw metrics ---
-    mean_chl = float(ds.chl.mean())
-    bloom_coverage = float(bloom_mask.mean() * 100)
-    sst = float(ds.sea_surface_temperature_anomaly.mean())
-    current_speed = float(np.sqrt(ds.uo**2 + ds.vo**2).mean())
-    nutrient_index = float((ds.no3.mean() + ds.po4.mean()) / 2)
+    # --- Raw metrics (single pass, also for dask-backed data) ---
+    raw = xr.Dataset({
+        "mean_chl": ds.chl.mean(),
+        "bloom_coverage": bloom_mask.mean() * 100,
+        "sst": ds.sea_surface_temperature_anomaly.mean(),
+        "current_speed": np.sqrt(ds.uo**2 + ds.vo**2).mean(),
+        "nutrient_index": (ds.no3.mean() + ds.po4.mean()) / 2,
+        "growth": ds.chl.diff("time").mean(),
+    }).compute()
 
-    growth = float(ds.chl.diff("time").mean())
+    mean_chl = float(raw.mean_chl)
+    bloom_coverage = float(raw.bloom_coverage)
+    sst = float(raw.sst)
+    current_speed = float(raw.current_speed)
+    nutrient_index = float(raw.nutrient_index)
+
+    growth = float(raw.growth)
 
     # =====================================================
     # INTERPRETATION RULES (very important)
@@ -91,11 +146,13 @@ def compute_kpis(ds, bloom_mask):
 # =========================================================
 def plot_multivariate_trend(ds):
 
-    chl  = ds.chl.mean(dim=["latitude","longitude"])
-    phyc = ds.phyc.mean(dim=["latitude","longitude"])
-    no3  = ds.no3.mean(dim=["latitude","longitude"])
-    po4  = ds.po4.mean(dim=["latitude","longitude"])
-    sst  = ds.sea_surface_temperature_anomaly.mean(dim=["latitude","longitude"])
+    means = _spatial_means(ds, ["chl", "phyc", "no3", "po4", "sea_surface_temperature_anomaly"])
+
+    chl  = means.chl
+    phyc = means.phyc
+    no3  = means.no3
+    po4  = means.po4
+    sst  = means.sea_surface_temperature_anomaly
 
     fig, ax = plt.subplots(figsize=(10,4))
 
@@ -116,9 +173,9 @@ def plot_multivariate_trend(ds):
 # =========================================================
 def plot_bloom_timeseries(ds, bloom_mask):
 
-    coverage = bloom_mask.mean(dim=["latitude","longitude"]) * 100
+    coverage = (bloom_mask.mean(dim=["latitude","longitude"]) * 100).compute()
 
-    chl_mean  = ds.chl.mean(dim=["latitude","longitude"])
+    chl_mean  = _spatial_means(ds, ["chl"]).chl
   
     fig, ax1 = plt.subplots(figsize=(9,4))
 
@@ -142,10 +199,12 @@ def plot_bloom_timeseries(ds, bloom_mask):
 # =========================================================
 def plot_environment_timeseries(ds):
 
-    chl  = ds.chl.mean(dim=["latitude","longitude"])
-    no3  = ds.no3.mean(dim=["latitude","longitude"])
-    po4  = ds.po4.mean(dim=["latitude","longitude"])
-    sst  = ds.sea_surface_temperature_anomaly.mean(dim=["latitude","longitude"])
+    means = _spatial_means(ds, ["chl", "no3", "po4", "sea_surface_temperature_anomaly"])
+
+    chl  = means.chl
+    no3  = means.no3
+    po4  = means.po4
+    sst  = means.sea_surface_temperature_anomaly
 
     fig, ax = plt.subplots(figsize=(9,4))
 
@@ -176,7 +235,10 @@ def plot_regional_bloom(ds):
         "West":  ds.sel(longitude=slice(None, lon_mid)),
     }
 
-    means = [float(r.chl.mean()) for r in regions.values()]
+    means = xr.Dataset({
+        name: r.chl.mean() for name, r in regions.items()
+    }).compute()
+    means = [float(means[name]) for name in regions]
 
     fig, ax = plt.subplots()
     ax.bar(regions.keys(), means)
@@ -191,20 +253,19 @@ def plot_regional_bloom(ds):
 # 5️⃣ Correlation matrix
 # =========================================================
 def plot_correlation_matrix(ds):
+    import seaborn as sns
 
     speed = _current_speed(ds)
 
-    df = pd.DataFrame({
-        "chl": ds.chl.values.flatten(),
-        "phyc": ds.phyc.values.flatten(),
-        "nppv": ds.nppv.values.flatten(),
-        "no3": ds.no3.values.flatten(),
-        "po4": ds.po4.values.flatten(),
-        "sst": ds.sea_surface_temperature_anomaly.values.flatten(),
-        "current_speed": speed.values.flatten(),
-    }).dropna()
-
-    corr = df.corr()
+    corr = _masked_corr({
+        "chl": ds.chl,
+        "phyc": ds.phyc,
+        "nppv": ds.nppv,
+        "no3": ds.no3,
+        "po4": ds.po4,
+        "sst": ds.sea_surface_temperature_anomaly,
+        "current_speed": speed,
+    })
 
     fig, ax = plt.subplots(figsize=(6,5))
     sns.heatmap(corr, annot=True, cmap="coolwarm", ax=ax)
@@ -217,6 +278,7 @@ def plot_correlation_matrix(ds):
 # =========================================================
 def plot_driver_scatter(ds):
 
+    ds = _subsample(ds).compute()
     speed = _current_speed(ds)
 
     chl, no3, sst = _flatten_valid(
@@ -243,12 +305,28 @@ def plot_driver_scatter(ds):
 # =========================================================
 def plot_growth_distribution(ds):
 
-    growth = ds.chl.diff("time").values.flatten()
-    growth = growth[~np.isnan(growth)]
-
     fig, ax = plt.subplots()
-    ax.hist(growth, bins=40)
     ax.set_title("Bloom Growth Rate Distribution")
     ax.set_xlabel("Δ Chlorophyll")
 
+    # A single day has no growth: empty plot
+    if ds.time.size < 2:
+        return fig
+
+    growth = ds.chl.diff("time")
+    lo, hi = xr.Dataset({"lo": growth.min(), "hi": growth.max()}).compute().to_array().values
+    if not np.isfinite([lo, hi]).all():
+        return fig
+    edges = np.linspace(lo, hi, 41)
+
+    # Histogram counts accumulated chunk by chunk when dask-backed
+    data = growth.data
+    if hasattr(data, "dask"):
+        import dask.array as dsa
+        counts = dsa.histogram(data[~dsa.isnan(data)], bins=edges)[0].compute()
+    else:
+        counts = np.histogram(data[~np.isnan(data)], bins=edges)[0]
+
+    ax.stairs(counts, edges, fill=True)
+
     return fig
@@ -1,5 +1,3 @@
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.animation import FuncAnimation, PillowWriter
@@ -9,6 +7,9 @@ import tempfile, os
 # 1️⃣ Chlorophyll + Bloom Overlay
 # =========================================================
 def plot_chl_bloom(ds, bloom_mask, lat_min, lat_max, lon_min, lon_max):
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+
     fig = plt.figure(figsize=(6,6))
     ax = plt.axes(projection=ccrs.PlateCarree())
     ax.set_extent([lon_min, lon_max, lat_min, lat_max])
@@ -37,7 +38,10 @@ def plot_chl_bloom(ds, bloom_mask, lat_min, lat_max, lon_min, lon_max):
 # 2️⃣ Mean Bloom Map
 # =========================================================
 def plot_mean_bloom_map(ds, threshold, lat_min, lat_max, lon_min, lon_max):
-    chl_mean = ds.chl.mean(dim="time")
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+
+    chl_mean = ds.chl.mean(dim="time").compute()
     bloom = chl_mean.where(chl_mean > threshold)
     vmax = np.nanpercentile(bloom,95)
 
@@ -58,6 +62,9 @@ def plot_mean_bloom_map(ds, threshold, lat_min, lat_max, lon_min, lon_max):
 # 3. Generic Variable Map (NO3, PO4, NPP, SST, Currents)
 # =========================================================
 def plot_variable_map(ds, var, title, lat_min, lat_max, lon_min, lon_max):
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+
     fig = plt.figure(figsize=(6,6))
     ax = plt.axes(projection=ccrs.PlateCarree())
     ax.set_extent([lon_min, lon_max, lat_min, lat_max])
@@ -80,6 +87,9 @@ def plot_variable_map(ds, var, title, lat_min, lat_max, lon_min, lon_max):
 # 4️⃣ Animation
 # =========================================================
 def animate_variable(ds, var, lat_min, lat_max, lon_min, lon_max):
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+
     gif = os.path.join(tempfile.gettempdir(), f"{var}.gif")
     times = ds.time.values
 
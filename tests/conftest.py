@@ -0,0 +1,48 @@
+import os
+import sys
+import datetime
+
+import pytest
+
+# The application imports its packages from src/ (see streamlit_app.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+# Everything runs offline against the in-memory backend
+os.environ.setdefault("HAB_STORAGE", "memory://")
+
+
+# Small raw archive ingested from the local Copernicus stand-in
+ARCHIVE_BBOX = (-36.0, -34.0, 120.0, 122.0)
+ARCHIVE_DAYS = [datetime.date(2026, 10, 11) + datetime.timedelta(days=i) for i in range(3)]
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """A fresh MemoryStorage as the process-wide backend, with its own object cache."""
+    from data.s3_cache import S3ObjectCache, set_cache
+    from data.storage import MemoryStorage, get_storage, set_storage
+
+    previous = get_storage()
+    backend = MemoryStorage()
+    set_storage(backend)
+    set_cache(S3ObjectCache(cache_dir=str(tmp_path / "s3_cache")))
+    yield backend
+    set_storage(previous)
+    set_cache(None)
+
+
+@pytest.fixture
+def archive(storage):
+    """ARCHIVE_DAYS of raw daily files over ARCHIVE_BBOX, with their manifest."""
+    from data.ingest_pipeline import run_ingestion
+    from data.local_copernicus import LocalCopernicusClient
+    from data.manifest import empty_manifest, save_manifest
+
+    manifest = empty_manifest()
+    failures = run_ingestion(
+        ARCHIVE_DAYS, ARCHIVE_BBOX, manifest=manifest, client=LocalCopernicusClient(),
+        fetch_workers=2, upload_workers=2,
+    )
+    assert not failures, failures
+    save_manifest(manifest)
+    return manifest
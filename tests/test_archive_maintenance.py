@@ -0,0 +1,28 @@
+import datetime
+
+from conftest import ARCHIVE_DAYS
+from data import s3_loader
+from data.archive_maintenance import raw_retention_keys
+from data.compact_zarr import append_day, merged_day
+from data.ingest_pipeline import publish_merged_day
+from data.manifest import DAILY_FILES
+
+
+def _raw_keys(day):
+    return [f"daily/{day.strftime('%Y/%m/%d')}/{fname}" for fname in DAILY_FILES]
+
+
+def test_raw_retention_keeps_recent_and_unmerged_days(archive, tmp_path, monkeypatch):
+    monkeypatch.setattr(s3_loader, "ZARR_STORE", str(tmp_path / "cube.zarr"))
+    first, middle, last = ARCHIVE_DAYS
+
+    # first and middle rolled up, only first compacted; last has raw files only
+    for day in (first, middle):
+        publish_merged_day(day, merged_day(day), manifest=archive)
+    append_day(first, ds_day=merged_day(first))
+
+    today = last + datetime.timedelta(days=1)
+    assert raw_retention_keys(archive, keep_days=10, today=today) == []
+    assert raw_retention_keys(archive, keep_days=0, today=today) == _raw_keys(first) + _raw_keys(middle)
+    assert raw_retention_keys(archive, keep_days=2, today=today) == _raw_keys(first)
+    assert raw_retention_keys(archive, keep_days=0, require_zarr=True, today=today) == _raw_keys(first)
@@ -0,0 +1,58 @@
+import datetime
+
+import numpy as np
+import xarray as xr
+
+from data.archive_maintenance import compacted_days
+from data.compact_zarr import FEATURES, append_day
+
+LAT = np.arange(-40.0, -35.0, 0.25)
+LON = np.arange(110.0, 117.5, 0.25)
+
+
+def _day(day):
+    """One merged day whose every value is the day of the month."""
+    shape = (1, LAT.size, LON.size)
+    return xr.Dataset(
+        {var: (("time", "latitude", "longitude"), np.full(shape, day.day, "float32")) for var in FEATURES},
+        coords={"time": [np.datetime64(day, "ns")], "latitude": LAT, "longitude": LON},
+    )
+
+
+def test_late_filled_gap_is_inserted_in_order(tmp_path):
+    store = str(tmp_path / "cube.zarr")
+    days = [datetime.date(2026, 10, d) for d in (12, 13, 15, 16)]
+    for day in days:
+        assert append_day(day, store=store, ds_day=_day(day))
+
+    late = datetime.date(2026, 10, 14)
+    assert late not in compacted_days(store)
+
+    assert append_day(late, store=store, ds_day=_day(late))
+    assert not append_day(late, store=store, ds_day=_day(late))
+    assert late in compacted_days(store)
+
+    cube = xr.open_zarr(store, consolidated=True)
+    expected = [np.datetime64(datetime.date(2026, 10, d), "ns") for d in range(12, 17)]
+    assert list(cube.time.values) == expected
+    for i, day in enumerate(range(12, 17)):
+        assert float(cube.chl.isel(time=i).mean()) == day
+        assert float(cube.vo.isel(time=i).min()) == day
+
+
+def test_default_store_follows_set_storage(tmp_path):
+    from data.s3_loader import load_from_s3, zarr_store
+    from data.storage import LocalStorage, get_storage, set_storage
+
+    previous = get_storage()
+    set_storage(LocalStorage(str(tmp_path)))
+    try:
+        assert zarr_store() == str(tmp_path / "cube.zarr")
+        day = datetime.date(2026, 10, 12)
+        assert append_day(day, ds_day=_day(day))
+        assert (tmp_path / "cube.zarr").exists()
+
+        ds = load_from_s3(day, day, -40, -36, 110, 115, source="zarr")
+        assert float(ds.chl.mean()) == day.day
+    finally:
+        set_storage(previous)
@@ -0,0 +1,52 @@
+import xarray as xr
+
+from conftest import ARCHIVE_BBOX, ARCHIVE_DAYS
+from data.dataset_manager import SessionDataset
+from data.ingest_pipeline import run_ingestion
+from data.local_copernicus import LocalCopernicusClient
+from data.manifest import rebuild_manifest
+from data.s3_loader import load_from_s3
+
+
+class RecordingLoader:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, start_date, end_date, *bbox, lazy=False):
+        self.calls.append((start_date, end_date))
+        return load_from_s3(start_date, end_date, *bbox, lazy=lazy)
+
+
+def test_window_extends_at_either_end_and_bbox_narrows_in_memory(archive):
+    first, middle, last = ARCHIVE_DAYS
+    loader = RecordingLoader()
+    session = SessionDataset(loader)
+
+    session.get(middle, middle, *ARCHIVE_BBOX)
+    ds = session.get(first, last, *ARCHIVE_BBOX)
+    assert loader.calls == [(middle, middle), (first, first), (last, last)]
+    xr.testing.assert_identical(ds, load_from_s3(first, last, *ARCHIVE_BBOX))
+
+    narrow = (-35.5, -34.5, 120.5, 121.5)
+    ds = session.get(first, middle, *narrow)
+    assert len(loader.calls) == 3
+    xr.testing.assert_identical(ds, load_from_s3(first, middle, *narrow))
+
+
+def test_interior_day_without_data_is_retried(storage):
+    first, middle, last = ARCHIVE_DAYS
+    client = LocalCopernicusClient()
+    assert not run_ingestion([first, last], ARCHIVE_BBOX, client=client)
+    rebuild_manifest()
+
+    loader = RecordingLoader()
+    session = SessionDataset(loader)
+    assert session.get(first, last, *ARCHIVE_BBOX).time.size == 2
+
+    # The gap is ingested later
+    assert not run_ingestion([middle], ARCHIVE_BBOX, client=client)
+    rebuild_manifest()
+
+    ds = session.get(first, last, *ARCHIVE_BBOX)
+    assert loader.calls[-1] == (middle, middle)
+    xr.testing.assert_identical(ds, load_from_s3(first, last, *ARCHIVE_BBOX))
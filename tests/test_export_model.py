@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from forecasting import export_model
+from forecasting.forecast_model import FEATURES, INPUT_DAYS, LEAD_DAYS, TILE_SIZE
+
+
+class TileModel:
+    """Persistence forecast that, like an exported model, only takes TILE_SIZE patches."""
+
+    def predict(self, x, batch_size=None, verbose=0):
+        assert x.shape[2] <= TILE_SIZE and x.shape[3] <= TILE_SIZE, x.shape
+        return np.repeat(x[:, -1:, :, :, :1], LEAD_DAYS, axis=1)
+
+
+def test_parity_on_netcdf_grid_larger_than_a_tile(tmp_path, monkeypatch):
+    days, height, width = 6, TILE_SIZE + 37, 2 * TILE_SIZE + 22
+    rng = np.random.default_rng(0)
+    ds = xr.Dataset(
+        {var: (("time", "latitude", "longitude"), rng.lognormal(-1.5, 0.8, (days, height, width)))
+         for var in FEATURES},
+        coords={
+            "time": pd.date_range("2026-01-01", periods=days),
+            "latitude": np.linspace(-40, -30, height),
+            "longitude": np.linspace(110, 125, width),
+        },
+    )
+    path = tmp_path / "archive.nc"
+    ds.to_netcdf(path)
+
+    inputs = export_model.parity_inputs(netcdf=str(path), samples=2)
+    assert inputs.shape == (2, INPUT_DAYS, height, width, len(FEATURES))
+
+    monkeypatch.setattr(export_model, "TFLiteModel", lambda path: TileModel())
+    monkeypatch.setattr(export_model, "load_forecast_model", lambda backend: TileModel())
+    assert export_model.check_parity("model.tflite", inputs, tolerance=1e-4)
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from forecasting import forecast_cache
+from forecasting.forecast_cache import ForecastCache, cached_forecast, forecast_key, model_version
+from forecasting.forecast_model import FEATURES, INPUT_DAYS
+
+
+def _dataset(days=6, height=8, width=9, lat0=-40.0):
+    rng = np.random.default_rng(0)
+    return xr.Dataset(
+        {var: (("time", "latitude", "longitude"), rng.lognormal(-1.5, 0.8, (days, height, width)))
+         for var in FEATURES},
+        coords={
+            "time": pd.date_range("2026-10-01", periods=days),
+            "latitude": np.linspace(lat0, lat0 + 2, height),
+            "longitude": np.linspace(110, 112, width),
+        },
+    )
+
+
+def test_key_follows_window_grid_and_model_version():
+    ds = _dataset()
+    key = forecast_key(ds, "v1")
+
+    # Only the last INPUT_DAYS days count
+    assert forecast_key(ds.isel(time=slice(1, None)), "v1") == key
+    assert forecast_key(ds.isel(time=slice(None, -1)), "v1") != key
+
+    changed = ds.copy(deep=True)
+    changed["no3"][-1, 0, 0] += 1
+    assert forecast_key(changed, "v1") != key
+
+    assert forecast_key(ds.isel(latitude=slice(1, None)), "v1") != key
+    assert forecast_key(_dataset(lat0=-41.0), "v1") != key
+    assert forecast_key(ds, "v2") != key
+
+
+def test_model_version_follows_the_model_file(tmp_path, monkeypatch):
+    path = tmp_path / "model.keras"
+    path.write_bytes(b"weights")
+    monkeypatch.setattr(forecast_cache, "MODEL_PATH", str(path))
+    version = model_version("keras")
+    assert model_version("keras") == version
+
+    path.write_bytes(b"retrained weights")
+    os.utime(path, ns=(1, 1))
+    assert model_version("keras") != version
+
+
+def test_cached_forecast_runs_the_model_once_per_window(tmp_path, monkeypatch):
+    calls = []
+
+    def generate(window, backend):
+        calls.append(window.time.size)
+        return np.zeros(window.chl.shape[1:]), np.ones(window.chl.shape[1:])
+
+    monkeypatch.setattr(forecast_cache, "generate_forecast", generate)
+    monkeypatch.setattr(forecast_cache, "model_version", lambda backend: "v1")
+    cache = ForecastCache(max_entries=4, cache_dir=str(tmp_path))
+    ds = _dataset()
+
+    day1, _ = cached_forecast(ds, cache=cache)
+    cached_forecast(ds.isel(time=slice(-INPUT_DAYS, None)), cache=cache)
+    assert calls == [INPUT_DAYS]
+    assert cache.stats()["hits"] == 1 and not day1.flags.writeable
+
+    # Persisted: a fresh process-level cache reads it back from disk
+    assert ForecastCache(cache_dir=str(tmp_path)).get(forecast_key(ds, "v1")) is not None
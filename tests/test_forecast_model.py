@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from forecasting.forecast_model import FEATURES, LEAD_DAYS, generate_hindcast
+
+
+class PersistenceModel:
+    """Forecasts the last input day's (normalized) chlorophyll for every lead."""
+
+    def predict(self, x, batch_size=None, verbose=0):
+        return np.repeat(x[:, -1:, :, :, :1], LEAD_DAYS, axis=1)
+
+
+def _steady_dataset(days=10, height=12, width=15):
+    """Spatially varying fields that do not change from day to day."""
+    rng = np.random.default_rng(0)
+    return xr.Dataset(
+        {
+            var: (("time", "latitude", "longitude"),
+                  np.broadcast_to(rng.lognormal(-1.5, 0.8, (height, width)), (days, height, width)))
+            for var in FEATURES
+        },
+        coords={
+            "time": pd.date_range("2026-01-01", periods=days),
+            "latitude": np.linspace(-40, -37, height),
+            "longitude": np.linspace(110, 114, width),
+        },
+    )
+
+
+def test_persistence_hindcast_scores_zero_error_on_steady_fields():
+    ds = _steady_dataset()
+    hindcast = generate_hindcast(ds, batch_size=3, model=PersistenceModel())
+
+    assert hindcast.forecast.dims == ("init_time", "lead", "latitude", "longitude")
+    np.testing.assert_allclose(hindcast.forecast.isel(init_time=0, lead=0), ds.chl.isel(time=0), rtol=1e-4)
+    assert (hindcast.n_valid > 0).all()
+    np.testing.assert_allclose(hindcast.rmse, 0, atol=1e-4)
+    np.testing.assert_allclose(hindcast.bias, 0, atol=1e-4)
+
+
+def test_lazy_window_is_fetched_once_per_day(monkeypatch):
+    import dask
+    import dask.array as dsa
+    from forecasting import forecast_model
+
+    ds = _steady_dataset(days=6)
+    fetched = []
+
+    def day_block(i):
+        fetched.append(i)
+        return np.stack([ds[var].values[i] for var in FEATURES])
+
+    shape = (len(FEATURES), ds.latitude.size, ds.longitude.size)
+    stacked = dsa.stack(
+        [dsa.from_delayed(dask.delayed(day_block)(i), shape=shape, dtype="float64") for i in range(ds.time.size)],
+        axis=1,
+    )
+    lazy = ds.copy()
+    for i, var in enumerate(FEATURES):
+        lazy[var] = (("time", "latitude", "longitude"), stacked[i])
+
+    monkeypatch.setattr(forecast_model, "load_forecast_model", lambda backend=None: PersistenceModel())
+    day1, day2 = forecast_model.generate_forecast(lazy)
+
+    assert sorted(fetched) == [2, 3, 4, 5]
+    np.testing.assert_allclose(day1, ds.chl.isel(time=-1), rtol=1e-4)
+
+
+class NeighbourhoodModel:
+    """Mean of each cell's 3x3 neighbourhood on the last day: depends on patch edges."""
+
+    def predict(self, x, batch_size=None, verbose=0):
+        last = np.pad(x[:, -1, :, :, 0], ((0, 0), (1, 1), (1, 1)), mode="edge")
+        h, w = x.shape[2:4]
+        mean = sum(last[:, i:i + h, j:j + w] for i in range(3) for j in range(3)) / 9
+        return np.repeat(mean[:, None, :, :, None], LEAD_DAYS, axis=1)
+
+
+def test_tiled_prediction_matches_whole_grid_prediction():
+    from forecasting.forecast_model import INPUT_DAYS, predict_tiled, tile_starts
+
+    rng = np.random.default_rng(0)
+    inputs = rng.standard_normal((2, INPUT_DAYS, 150, 100, len(FEATURES)), dtype=np.float32)
+
+    # Pointwise model: blending overlapping patches changes nothing
+    tiled = predict_tiled(PersistenceModel(), inputs, tile=64, overlap=16, batch_size=3)
+    np.testing.assert_allclose(tiled, PersistenceModel().predict(inputs), rtol=1e-6)
+
+    # Patch-edge effects stay in the overlaps: cells covered by one patch
+    # only (rows < 48, columns < 36 here) match the whole-grid prediction
+    whole = NeighbourhoodModel().predict(inputs)
+    tiled = predict_tiled(NeighbourhoodModel(), inputs, tile=64, overlap=16, batch_size=3)
+    assert tiled.shape == whole.shape
+    np.testing.assert_allclose(tiled[:, :, :48, :36], whole[:, :, :48, :36], rtol=1e-5, atol=1e-6)
+
+    assert tile_starts(150, 64, 16) == [0, 48, 86]
+    assert tile_starts(100, 64, 16) == [0, 36]
+    assert tile_starts(40, 64, 16) == [0]
+
+
+def test_fused_preprocessing_matches_the_per_variable_steps():
+    from forecasting.forecast_model import LOG_VARS, load_stats, preprocess_dataset
+
+    ds = _steady_dataset(days=4).copy(deep=True)
+    ds["chl"][1, 2:4, 3:6] = np.nan
+    stats = load_stats()
+
+    expected = []
+    for var in FEATURES:
+        arr = ds[var].values
+        if var in LOG_VARS:
+            arr = np.log1p(arr)
+        arr = np.nan_to_num(arr, nan=0.0)
+        expected.append((arr - stats[var]["mean"]) / (stats[var]["std"] + 1e-8))
+    expected = np.stack(expected, axis=-1)
+
+    data = preprocess_dataset(ds)
+    assert data.dtype == np.float32
+    np.testing.assert_allclose(data, expected, rtol=1e-5, atol=1e-5)
+
+    # Written in place into a preallocated batch
+    batch = np.zeros((2,) + expected.shape, dtype=np.float32)
+    assert np.shares_memory(preprocess_dataset(ds, out=batch[1]), batch)
+    np.testing.assert_array_equal(batch[1], data)
+    assert not batch[0].any()
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Everything streamlit_app imports at start-up
+APP_MODULES = [
+    "forecasting.forecast_cache",
+    "forecasting.forecast_model",
+    "visualization.visualizer",
+    "visualization.statistics",
+    "data.ingest_worker",
+    "data.s3_cache",
+    "data.dataset_manager",
+    "data.detection",
+]
+
+SCRIPT = """
+import importlib, sys
+
+class Refuse:
+    # Fails any import of a deferred module, installed or not
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] in ("tensorflow", "cartopy", "seaborn"):
+            raise ImportError(f"{name} imported at start-up")
+
+sys.meta_path.insert(0, Refuse())
+for module in sys.argv[1:]:
+    importlib.import_module(module)
+"""
+
+
+def test_app_start_up_does_not_import_heavy_modules():
+    env = dict(os.environ, PYTHONPATH=SRC, MPLBACKEND="Agg")
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, *APP_MODULES], env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,64 @@
+import datetime
+
+import xarray as xr
+
+from data.fetch_copernicus import DATASETS
+from data.ingest_pipeline import archive_key, run_ingestion
+from data.local_copernicus import LocalCopernicusClient
+
+BBOX = (-36.0, -35.0, 120.0, 121.0)
+DAYS = [datetime.date(2026, 10, 11) + datetime.timedelta(days=i) for i in range(6)]
+
+
+class MissingDayClient(LocalCopernicusClient):
+    """Stand-in server on which one (dataset, day) is not published."""
+
+    def __init__(self, dataset_id, day):
+        super().__init__()
+        self.missing_id = dataset_id
+        self.missing_day = day
+
+    def subset(self, dataset_id, start_datetime, end_datetime, **kwargs):
+        start = datetime.date.fromisoformat(str(start_datetime)[:10])
+        end = datetime.date.fromisoformat(str(end_datetime)[:10])
+        if dataset_id == self.missing_id and start <= self.missing_day <= end:
+            raise RuntimeError(f"{dataset_id} has no data for {self.missing_day}")
+        return super().subset(
+            dataset_id, start_datetime=start_datetime, end_datetime=end_datetime, **kwargs
+        )
+
+
+def test_batch_fetch_loses_only_the_missing_day():
+    client = MissingDayClient(DATASETS["sst"]["dataset_id"], DAYS[-1])
+    completed = []
+
+    failures = run_ingestion(
+        DAYS, BBOX, client=client, batch=True, fetch_workers=2, upload_workers=2,
+        upload=lambda path, key: None, on_day=lambda day, files: completed.append(day),
+    )
+
+    assert set(failures) == {(DAYS[-1], "sst")}
+    assert completed == DAYS[:-1]
+
+
+def test_merged_day_loads_like_the_raw_files(storage, archive, monkeypatch):
+    from conftest import ARCHIVE_BBOX, ARCHIVE_DAYS
+    from data.compact_zarr import merged_day
+    from data.ingest_pipeline import publish_merged_day
+    from data.manifest import save_manifest
+    from data.s3_loader import MERGED_FILE, load_from_s3
+
+    raw = load_from_s3(ARCHIVE_DAYS[0], ARCHIVE_DAYS[-1], *ARCHIVE_BBOX, use_cache=False)
+    for day in ARCHIVE_DAYS:
+        publish_merged_day(day, merged_day(day), manifest=archive)
+    save_manifest(archive)
+
+    fetched = []
+    download = storage.download
+    monkeypatch.setattr(storage, "download", lambda key, path: fetched.append(key) or download(key, path))
+    merged = load_from_s3(ARCHIVE_DAYS[0], ARCHIVE_DAYS[-1], *ARCHIVE_BBOX, use_cache=False)
+
+    assert sorted(fetched) == [archive_key(day, "merged") for day in ARCHIVE_DAYS]
+    assert all(key.endswith(MERGED_FILE) for key in fetched)
+    # Packed once more on upload (quantize: relative error below 5e-4)
+    xr.testing.assert_allclose(merged, raw, rtol=5e-4)
@@ -0,0 +1,49 @@
+import datetime
+import subprocess
+
+import pytest
+
+from data import ingest_worker
+from data.ingest_worker import FAILED, QUEUED, STALE_SECONDS, job_status, submit_job
+
+
+@pytest.fixture(autouse=True)
+def worker_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_worker, "WORKER_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _age_job(job_id, seconds):
+    created = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=seconds)
+    ingest_worker._update_job(job_id, created=created.isoformat(timespec="seconds"))
+
+
+def test_queued_job_without_a_worker_fails_instead_of_waiting_forever():
+    job = submit_job()
+    assert job_status(job["id"])["state"] == QUEUED
+
+    _age_job(job["id"], STALE_SECONDS + 1)
+    stale = job_status(job["id"])
+    assert stale["state"] == FAILED
+    assert "worker.log" in stale["message"]
+
+    # A new submit queues a fresh run instead of returning the dead one
+    assert submit_job()["id"] != job["id"]
+
+
+def test_queued_job_waits_while_a_worker_is_alive():
+    job = submit_job()
+    worker = ingest_worker.IngestWorker()
+    assert worker._claim_worker()
+
+    _age_job(job["id"], STALE_SECONDS + 1)
+    assert job_status(job["id"])["state"] == QUEUED
+
+
+def test_worker_output_goes_to_the_log_file(worker_dir, monkeypatch):
+    spawned = {}
+    monkeypatch.setattr(subprocess, "Popen", lambda args, **kwargs: spawned.update(kwargs))
+
+    assert ingest_worker.ensure_worker()
+    assert spawned["stdout"].name == str(worker_dir / "worker.log")
+    assert spawned["stderr"] == subprocess.STDOUT
@@ -0,0 +1,60 @@
+import datetime
+
+from data.manifest import MANIFEST_KEY
+from data.s3_utils import get_last_available_date
+from data.storage import MemoryStorage, get_storage, set_storage
+
+
+def test_last_available_date_does_not_write_the_manifest():
+    storage = MemoryStorage()
+    storage.put("daily/2026/10/15/pft.nc", b"x")
+    storage.put("daily/2026/10/16/pft.nc", b"x")
+    previous = get_storage()
+    set_storage(storage)
+    try:
+        assert get_last_available_date() == datetime.date(2026, 10, 16)
+        assert MANIFEST_KEY not in storage.objects
+    finally:
+        set_storage(previous)
+
+
+def test_ingest_manifest_matches_the_archive(storage, archive):
+    from conftest import ARCHIVE_DAYS
+    from data.manifest import DAILY_FILES, day_files, find_gaps, last_date, load_manifest, rebuild_manifest
+
+    assert load_manifest() == archive
+    # A listing-based rebuild finds the same objects and ETags
+    def etags(manifest):
+        return {day: {f: e["etag"] for f, e in files.items()} for day, files in manifest["days"].items()}
+    assert etags(rebuild_manifest(save=False)) == etags(archive)
+    for day in ARCHIVE_DAYS:
+        files = day_files(archive, day)
+        assert sorted(files) == sorted(DAILY_FILES)
+        for fname, entry in files.items():
+            assert storage.head(f"daily/{day.strftime('%Y/%m/%d')}/{fname}")["etag"] == entry["etag"]
+
+    later = ARCHIVE_DAYS[-1] + datetime.timedelta(days=1)
+    assert last_date(archive, complete_only=True) == ARCHIVE_DAYS[-1]
+    assert find_gaps(archive, ARCHIVE_DAYS[0], later) == [(later, DAILY_FILES)]
+
+
+def test_loader_requests_only_objects_the_manifest_lists(storage, archive, monkeypatch):
+    from conftest import ARCHIVE_BBOX, ARCHIVE_DAYS
+    from data.manifest import rebuild_manifest
+    from data.s3_loader import load_from_s3
+
+    missing = f"daily/{ARCHIVE_DAYS[0].strftime('%Y/%m/%d')}/sst.nc"
+    storage.delete([missing])
+    rebuild_manifest()
+
+    requested = []
+    for method in ("get", "download", "head"):
+        original = getattr(storage, method)
+        monkeypatch.setattr(
+            storage, method,
+            lambda key, *args, _original=original: requested.append(key) or _original(key, *args),
+        )
+
+    ds = load_from_s3(ARCHIVE_DAYS[0], ARCHIVE_DAYS[-1], *ARCHIVE_BBOX)
+    assert missing not in requested
+    assert ds.sea_surface_temperature_anomaly.isel(time=0).isnull().all()
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+from data import regrid
+from data.regrid import regrid_to
+
+
+@pytest.fixture(autouse=True)
+def private_index_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(regrid, "REGRID_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(regrid, "_indexes", {})
+
+
+def _source():
+    """0.083° currents-like field, descending latitudes, a NaN patch."""
+    rng = np.random.default_rng(0)
+    lat = np.arange(-34.0, -36.0 - 1e-9, -1 / 12)
+    lon = np.arange(120.0, 122.0 + 1e-9, 1 / 12)
+    values = rng.normal(0, 0.13, (lat.size, lon.size))
+    values[3:6, 4:9] = np.nan
+    return xr.Dataset({"uo": (("latitude", "longitude"), values)}, coords={"latitude": lat, "longitude": lon})
+
+
+def test_nearest_matches_xarray_interp():
+    src = _source()
+    # 0.25° target grid reaching past the source on every side
+    lat = np.arange(-36.5, -33.5 + 1e-9, 0.25)
+    lon = np.arange(119.5, 122.5 + 1e-9, 0.25)
+
+    expected = src.interp(latitude=lat, longitude=lon, method="nearest")
+    result = regrid_to(src, lat, lon, "nearest")
+    xr.testing.assert_identical(result, expected)
+
+    # Second call served from the cached index
+    assert len(regrid._indexes) == 1
+    xr.testing.assert_identical(regrid_to(src, lat, lon, "nearest"), expected)
+
+
+def test_block_mean_averages_the_finite_source_cells():
+    src = _source()
+    lat = np.arange(-36.0, -34.0 + 1e-9, 0.25)
+    lon = np.arange(120.0, 122.0 + 1e-9, 0.25)
+    result = regrid_to(src, lat, lon, "block_mean")
+
+    # Target cell (-35, 121) covers sources within half a target step
+    near = src.uo.sel(latitude=slice(-34.875, -35.125), longitude=slice(120.875, 121.125))
+    assert float(result.uo.sel(latitude=-35.0, longitude=121.0)) == pytest.approx(float(near.mean()))
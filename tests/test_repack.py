@@ -0,0 +1,41 @@
+import numpy as np
+import xarray as xr
+
+from data.repack import PACKED_MAX, QUANTIZE_DIGITS, repack_netcdf
+
+
+def _write(path):
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(-1.5, 0.8, (1, 30, 40))
+    values[0, 0, :5] = np.nan
+    ds = xr.Dataset(
+        {"chl": (("time", "latitude", "longitude"), values)},
+        coords={"time": [np.datetime64("2026-10-12", "ns")],
+                "latitude": np.linspace(-36, -35, 30), "longitude": np.linspace(120, 121, 40)},
+    )
+    ds.to_netcdf(path)
+    return values
+
+
+def _repacked(path, mode):
+    original = _write(path)
+    before, after = repack_netcdf(str(path), mode)
+    assert after < before
+    with xr.open_dataset(path) as ds:
+        return original, ds.chl.values
+
+
+def test_int16_error_is_within_half_a_packing_step(tmp_path):
+    original, packed = _repacked(tmp_path / "pft.nc", "int16")
+
+    np.testing.assert_array_equal(np.isnan(packed), np.isnan(original))
+    step = (np.nanmax(original) - np.nanmin(original)) / (2 * PACKED_MAX)
+    assert np.nanmax(np.abs(packed - original)) <= step / 2 * 1.001
+
+
+def test_quantize_relative_error_is_below_the_kept_digits(tmp_path):
+    original, packed = _repacked(tmp_path / "pft.nc", "quantize")
+
+    assert packed.dtype == np.float32
+    np.testing.assert_array_equal(np.isnan(packed), np.isnan(original))
+    assert np.nanmax(np.abs(packed - original) / original) <= 5 * 10.0 ** -QUANTIZE_DIGITS
@@ -0,0 +1,82 @@
+import os
+import time
+
+from data.s3_cache import ORPHAN_SECONDS, S3ObjectCache
+from data.storage import MemoryStorage
+
+
+def _storage(**objects):
+    storage = MemoryStorage()
+    for key, data in objects.items():
+        storage.put(key, data)
+    return storage
+
+
+def test_processes_sharing_a_cache_dir_keep_each_others_entries(tmp_path):
+    storage = _storage(a=b"aaa", b=b"bbb")
+    first = S3ObjectCache(storage, cache_dir=str(tmp_path))
+    path_a = first.get("a")
+
+    # A second process starting while the first one's entry is unflushed
+    second = S3ObjectCache(storage, cache_dir=str(tmp_path))
+    assert os.path.exists(path_a)
+    path_b = second.get("b")
+
+    first.flush()
+    second.flush()
+
+    third = S3ObjectCache(storage, cache_dir=str(tmp_path))
+    assert third.get("a") == path_a
+    assert third.get("b") == path_b
+    assert third.stats()["misses"] == 0
+
+
+def test_only_stale_orphans_are_swept(tmp_path):
+    fresh = tmp_path / "download.tmp"
+    stale = tmp_path / "crashed.tmp"
+    fresh.write_bytes(b"in flight")
+    stale.write_bytes(b"left behind")
+    old = time.time() - ORPHAN_SECONDS - 1
+    os.utime(stale, (old, old))
+
+    S3ObjectCache(_storage(), cache_dir=str(tmp_path))
+
+    assert fresh.exists()
+    assert not stale.exists()
+
+
+def test_loader_import_leaves_the_cache_dir_alone(tmp_path):
+    import subprocess
+    import sys
+
+    cache_dir = tmp_path / "cache"
+    src = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+    script = (
+        "import os, data.s3_loader\n"
+        "from data.s3_cache import get_cache\n"
+        f"assert not os.path.exists({str(cache_dir)!r})\n"
+        "assert get_cache() is get_cache()\n"
+        f"assert os.path.isdir({str(cache_dir)!r})\n"
+    )
+    env = dict(os.environ, PYTHONPATH=src, HAB_CACHE_DIR=str(cache_dir))
+    subprocess.run([sys.executable, "-c", script], env=env, check=True)
+
+
+def test_warm_cache_serves_the_loader_without_object_requests(storage, archive, monkeypatch):
+    from conftest import ARCHIVE_BBOX, ARCHIVE_DAYS
+    from data.manifest import MANIFEST_KEY
+    from data.s3_loader import load_from_s3
+
+    cold = load_from_s3(ARCHIVE_DAYS[0], ARCHIVE_DAYS[-1], *ARCHIVE_BBOX)
+
+    requests = []
+    for method in ("get", "download", "head"):
+        original = getattr(storage, method)
+        monkeypatch.setattr(
+            storage, method,
+            lambda key, *args, _original=original: requests.append(key) or _original(key, *args),
+        )
+
+    warm = load_from_s3(ARCHIVE_DAYS[0], ARCHIVE_DAYS[-1], *ARCHIVE_BBOX)
+    assert requests == [MANIFEST_KEY]
+    assert warm.identical(cold)
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+from conftest import ARCHIVE_BBOX, ARCHIVE_DAYS
+from data import s3_loader
+from data.manifest import rebuild_manifest
+from data.s3_cache import get_cache
+from data.s3_loader import FILES, load_from_s3
+from data.storage import get_storage
+
+QUERY_BBOX = (-35.5, -34.5, 120.5, 121.5)
+
+
+def _load(**kwargs):
+    return load_from_s3(ARCHIVE_DAYS[0], ARCHIVE_DAYS[-1], *QUERY_BBOX, **kwargs)
+
+
+def _baseline(tmp_path, bbox=QUERY_BBOX):
+    """
+    The original loader: every file downloaded and decoded whole, regridded
+    with ds.interp(method="nearest") onto the chl grid, the bbox cut last.
+    """
+    daily = []
+    for day in ARCHIVE_DAYS:
+        data_vars = {}
+        master = None
+        for fname, variables in FILES.items():
+            local = tmp_path / f"{day}_{fname}"
+            get_storage().download(f"daily/{day.strftime('%Y/%m/%d')}/{fname}", str(local))
+            ds = xr.open_dataset(local).isel(depth=0, time=0, drop=True, missing_dims="ignore")
+            ds = ds.drop_vars(["depth", "time"], errors="ignore")
+            if "chl" in ds:
+                master = ds.latitude, ds.longitude
+            else:
+                ds = ds.interp(latitude=master[0], longitude=master[1], method="nearest")
+            for var in variables:
+                data_vars[var] = ds[var]
+        ds_day = xr.merge(list(data_vars.values()), join="exact")
+        daily.append(ds_day.expand_dims(time=[np.datetime64(day, "ns")]))
+
+    lat_min, lat_max, lon_min, lon_max = bbox
+    ds_all = xr.concat(daily, dim="time")
+    return ds_all.sel(latitude=slice(lat_min, lat_max), longitude=slice(lon_min, lon_max)).astype("float32")
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_loader_matches_the_interp_baseline(archive, tmp_path, use_cache):
+    ds = _load(use_cache=use_cache)
+
+    assert list(ds.data_vars) == [var for variables in FILES.values() for var in variables]
+    xr.testing.assert_equal(ds, _baseline(tmp_path))
+
+
+def test_in_memory_loader_matches_the_interp_baseline(storage, archive, tmp_path, monkeypatch):
+    baseline = _baseline(tmp_path)
+
+    # Nothing goes through a local file
+    downloads = []
+    monkeypatch.setattr(storage, "download", lambda *args: downloads.append(args))
+    ds = _load(in_memory=True)
+
+    assert not downloads
+    xr.testing.assert_equal(ds, baseline)
+
+
+def test_bbox_between_grid_points_matches_the_interp_baseline(archive, tmp_path):
+    bbox = (-35.43, -34.61, 120.37, 121.29)
+    ds = load_from_s3(ARCHIVE_DAYS[0], ARCHIVE_DAYS[-1], *bbox)
+    xr.testing.assert_equal(ds, _baseline(tmp_path, bbox))
+
+
+def test_open_daily_file_decodes_only_the_bbox_and_halo(archive, tmp_path):
+    local = tmp_path / "cur.nc"
+    get_storage().download(f"daily/{ARCHIVE_DAYS[0].strftime('%Y/%m/%d')}/cur.nc", str(local))
+
+    whole = s3_loader.open_daily_file(str(local))
+    cut = s3_loader.open_daily_file(str(local), bbox=QUERY_BBOX, halo=0.25)
+
+    lat_min, lat_max, lon_min, lon_max = QUERY_BBOX
+    assert cut.uo.dims == ("latitude", "longitude")
+    assert cut.latitude.size < whole.latitude.size and cut.longitude.size < whole.longitude.size
+    assert float(cut.latitude.min()) >= lat_min - 0.25 and float(cut.latitude.max()) <= lat_max + 0.25
+    assert float(cut.longitude.min()) < lon_min and float(cut.longitude.max()) > lon_max
+    xr.testing.assert_identical(cut, whole.sel(latitude=cut.latitude, longitude=cut.longitude))
+
+
+def test_cube_is_float32_without_empty_days(storage, archive):
+    first, middle, last = ARCHIVE_DAYS
+    full = _load()
+    storage.delete([key for key in storage.objects if key.startswith(f"daily/{middle.strftime('%Y/%m/%d')}/")])
+    storage.delete([f"daily/{last.strftime('%Y/%m/%d')}/nut.nc"])
+    rebuild_manifest()
+
+    ds = _load()
+    assert all(ds[var].dtype == np.float32 for var in ds.data_vars)
+    assert list(ds.time.values) == [np.datetime64(first, "ns"), np.datetime64(last, "ns")]
+    assert ds.no3.isel(time=1).isnull().all() and ds.po4.isel(time=1).isnull().all()
+    xr.testing.assert_equal(ds.chl, full.chl.sel(time=ds.time))
+    xr.testing.assert_equal(ds.no3.isel(time=0), full.no3.isel(time=0))
+
+
+def test_lazy_fetches_one_feature_of_one_day_per_chunk(archive, monkeypatch):
+    eager = _load()
+    lazy = _load(lazy=True)
+    assert lazy.chl.data.chunks[0] == (1,) * len(ARCHIVE_DAYS)
+
+    fetched = []
+    fetch_file = s3_loader._fetch_file
+    monkeypatch.setattr(
+        s3_loader, "_fetch_file",
+        lambda day, fname, *args, **kwargs: fetched.append((day, fname)) or fetch_file(day, fname, *args, **kwargs),
+    )
+    flushes = []
+    cache = get_cache()
+    flush = cache.flush
+    monkeypatch.setattr(cache, "flush", lambda: flushes.append(1) or flush())
+
+    np.testing.assert_array_equal(lazy.no3.isel(time=-1).values, eager.no3.isel(time=-1).values)
+    assert fetched == [(ARCHIVE_DAYS[-1], "nut.nc")]
+    assert len(flushes) == 1
+
+    xr.testing.assert_identical(lazy.load(), eager)
+    assert len(flushes) == 2
@@ -0,0 +1,33 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from visualization.statistics import plot_growth_distribution
+
+
+def _chl(days):
+    rng = np.random.default_rng(0)
+    return xr.Dataset(
+        {"chl": (("time", "latitude", "longitude"), rng.lognormal(-1.5, 0.8, (days, 4, 5)))},
+        coords={
+            "time": pd.date_range("2026-10-01", periods=days),
+            "latitude": np.linspace(-36, -35, 4),
+            "longitude": np.linspace(120, 121, 5),
+        },
+    )
+
+
+def test_growth_distribution_of_a_single_day_is_empty():
+    fig = plot_growth_distribution(_chl(1))
+    assert not fig.axes[0].patches
+
+
+def test_growth_distribution_counts_every_cell_eagerly_and_lazily():
+    ds = _chl(6)
+    for data in (ds, ds.chunk({"time": 1})):
+        (stairs,) = plot_growth_distribution(data).axes[0].patches
+        assert stairs.get_data().values.sum() == 5 * 4 * 5
@@ -0,0 +1,47 @@
+import pytest
+
+from data.storage import LocalStorage, MemoryStorage, NotFound, S3Storage, storage_from_url
+
+
+@pytest.fixture(params=["local", "memory"])
+def backend(request, tmp_path):
+    if request.param == "local":
+        return LocalStorage(str(tmp_path / "archive"))
+    return MemoryStorage()
+
+
+def test_backends_share_one_contract(backend, tmp_path):
+    backend.put("daily/2026/10/12/pft.nc", b"pft")
+    src = tmp_path / "nut.nc"
+    src.write_bytes(b"nutrients")
+    backend.upload(str(src), "daily/2026/10/12/nut.nc")
+    backend.put("manifest.json", b"{}")
+
+    assert backend.get("daily/2026/10/12/pft.nc") == b"pft"
+    head = backend.head("daily/2026/10/12/nut.nc")
+    assert head["size"] == len(b"nutrients")
+
+    dst = tmp_path / "copy.nc"
+    assert backend.download("daily/2026/10/12/nut.nc", str(dst)) == head["etag"]
+    assert dst.read_bytes() == b"nutrients"
+
+    assert [obj["key"] for obj in backend.list("daily/")] == [
+        "daily/2026/10/12/nut.nc", "daily/2026/10/12/pft.nc",
+    ]
+    assert backend.list("daily/")[0]["etag"] == head["etag"]
+
+    assert backend.delete(["daily/2026/10/12/pft.nc", "daily/absent.nc"]) == []
+    for method in (backend.get, backend.head):
+        with pytest.raises(NotFound):
+            method("daily/2026/10/12/pft.nc")
+    with pytest.raises(NotFound):
+        backend.download("daily/2026/10/12/pft.nc", str(dst))
+
+
+def test_storage_from_url(tmp_path):
+    assert isinstance(storage_from_url("memory://"), MemoryStorage)
+    assert storage_from_url(f"file://{tmp_path}").url() == str(tmp_path)
+    assert storage_from_url(str(tmp_path)).url("a/b.nc") == str(tmp_path / "a" / "b.nc")
+
+    s3 = storage_from_url("s3://some-bucket/")
+    assert isinstance(s3, S3Storage) and s3.url("cube.zarr") == "s3://some-bucket/cube.zarr"
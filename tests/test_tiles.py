@@ -0,0 +1,59 @@
+import datetime
+
+import numpy as np
+import xarray as xr
+
+from data.tiles import parse_tile, split_tiles, stitch_tiles, tile_fname, tile_intersects
+
+DAY = datetime.date(2026, 10, 12)
+BBOX = (-45.0, -33.0, 110.0, 122.0)
+
+
+def _merged(lat, lon):
+    rng = np.random.default_rng(0)
+    return xr.Dataset(
+        {var: (("time", "latitude", "longitude"), rng.normal(size=(1, lat.size, lon.size)).astype("float32"))
+         for var in ("chl", "uo")},
+        coords={"time": [np.datetime64(DAY, "ns")], "latitude": lat, "longitude": lon},
+    )
+
+
+def test_split_and_stitch_round_trip():
+    ds = _merged(np.arange(-45.0, -32.9, 0.25), np.arange(110.0, 122.1, 0.25))
+    tiles = split_tiles(ds, size=5)
+
+    assert sorted(parse_tile(fname) for fname in tiles) == [
+        (lat0, lon0) for lat0 in (-45.0, -40.0, -35.0) for lon0 in (110.0, 115.0, 120.0)
+    ]
+    # Every grid point lands in exactly one tile
+    assert sum(t.latitude.size * t.longitude.size for t in tiles.values()) == ds.latitude.size * ds.longitude.size
+    xr.testing.assert_identical(stitch_tiles(list(tiles.values())), ds)
+
+    assert tile_intersects(tile_fname(-40, 115), (-38, -36, 116, 118), size=5)
+    assert not tile_intersects(tile_fname(-35, 115), (-38, -36, 116, 118), size=5)
+
+
+def test_bbox_loads_only_the_intersecting_tiles(storage, monkeypatch):
+    from data.compact_zarr import merged_day
+    from data.ingest_pipeline import archive_key, publish_merged_day, run_ingestion
+    from data.local_copernicus import LocalCopernicusClient
+    from data.manifest import empty_manifest, save_manifest
+    from data.s3_loader import load_from_s3
+
+    manifest = empty_manifest()
+    assert not run_ingestion([DAY], BBOX, manifest=manifest, client=LocalCopernicusClient())
+    save_manifest(manifest)
+    query = (-38.0, -36.0, 116.0, 118.0)
+    raw = load_from_s3(DAY, DAY, *query)
+
+    publish_merged_day(DAY, merged_day(DAY), manifest=manifest, layout="tiled")
+    save_manifest(manifest)
+
+    fetched = []
+    download = storage.download
+    monkeypatch.setattr(storage, "download", lambda key, path: fetched.append(key) or download(key, path))
+    tiled = load_from_s3(DAY, DAY, *query, use_cache=False)
+
+    assert fetched == [archive_key(DAY, "merged_-40_115")]
+    # Packed once more on upload (quantize: relative error below 5e-4)
+    xr.testing.assert_allclose(tiled, raw, rtol=5e-4)